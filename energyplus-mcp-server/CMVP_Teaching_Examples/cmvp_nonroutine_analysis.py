@@ -4,8 +4,11 @@ CMVP Non-Routine Adjustment Analysis
 Calculates the impact of the server room addition and required adjustments
 """
 
+import numpy as np
 import pandas as pd
 import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Output directories from simulation
@@ -16,49 +19,53 @@ year2_dir = "outputs/ASHRAE901_OfficeMedium_Year2_ServerRoom_simulation_20251023
 year1_meter = f"{year1_dir}/ASHRAE901_OfficeMediumMeter.csv"
 year2_meter = f"{year2_dir}/ASHRAE901_OfficeMedium_Year2_ServerRoomMeter.csv"
 
-df_year1 = pd.read_csv(year1_meter)
-df_year2 = pd.read_csv(year2_meter)
+# Only the timestamp and the two facility meters are used; EnergyPlus pads some
+# headers with whitespace, so match on the stripped name
+meter_columns = {
+    'Electricity:Facility [J](Hourly)': 'Elec_kWh',
+    'NaturalGas:Facility [J](Hourly)': 'Gas_kWh'
+}
+required_columns = {'Date/Time', *meter_columns}
+
+def read_meter_csv(path):
+    return pd.read_csv(path, engine='c', usecols=lambda c: c.strip() in required_columns)
+
+# The two files are independent and the C parser releases the GIL, so read
+# them concurrently
+with ThreadPoolExecutor(max_workers=2) as executor:
+    df_year1, df_year2 = executor.map(read_meter_csv, [year1_meter, year2_meter])
 
 # Clean columns
 df_year1.columns = df_year1.columns.str.strip()
 df_year2.columns = df_year2.columns.str.strip()
 
-# Extract month
-df_year1['Month'] = df_year1['Date/Time'].str.split('/').str[0].astype(int)
-df_year2['Month'] = df_year2['Date/Time'].str.split('/').str[0].astype(int)
+# Extract month (EnergyPlus emits ' MM/DD  HH:MM:SS')
+df_year1['Month'] = df_year1['Date/Time'].str.strip().str.slice(0, 2).astype('int8')
+df_year2['Month'] = df_year2['Date/Time'].str.strip().str.slice(0, 2).astype('int8')
 
 # Convert J to kWh
 J_to_kWh = 1.0 / 3600000.0
 
-# Monthly aggregation
-year1_monthly = df_year1.groupby('Month').agg({
-    'Electricity:Facility [J](Hourly)': 'sum',
-    'NaturalGas:Facility [J](Hourly)': 'sum'
-}).reset_index()
-
-year2_monthly = df_year2.groupby('Month').agg({
-    'Electricity:Facility [J](Hourly)': 'sum',
-    'NaturalGas:Facility [J](Hourly)': 'sum'
-}).reset_index()
-
-# Convert to kWh
-for df in [year1_monthly, year2_monthly]:
-    df['Elec_kWh'] = df['Electricity:Facility [J](Hourly)'] * J_to_kWh
-    df['Gas_kWh'] = df['NaturalGas:Facility [J](Hourly)'] * J_to_kWh
-    df['Total_kWh'] = df['Elec_kWh'] + df['Gas_kWh']
-
-# Merge for comparison
-comparison = pd.merge(
-    year1_monthly[['Month', 'Elec_kWh', 'Gas_kWh', 'Total_kWh']],
-    year2_monthly[['Month', 'Elec_kWh', 'Gas_kWh', 'Total_kWh']],
-    on='Month',
-    suffixes=('_Year1', '_Year2')
-)
+# Monthly aggregation: one code-based groupby per year, converted to kWh in the same pass
+monthly = []
+for df in [df_year1, df_year2]:
+    df['Month'] = pd.Categorical(df['Month'], categories=range(1, 13), ordered=True)
+    df_monthly = (df.groupby('Month', observed=True, sort=False)[list(meter_columns)].sum()
+                  * J_to_kWh).rename(columns=meter_columns)
+    df_monthly.index = df_monthly.index.astype(int)
+    df_monthly['Total_kWh'] = df_monthly['Elec_kWh'] + df_monthly['Gas_kWh']
+    monthly.append(df_monthly)
 
-# Calculate differences
-comparison['Elec_Change_kWh'] = comparison['Elec_kWh_Year2'] - comparison['Elec_kWh_Year1']
-comparison['Gas_Change_kWh'] = comparison['Gas_kWh_Year2'] - comparison['Gas_kWh_Year1']
-comparison['Total_Change_kWh'] = comparison['Total_kWh_Year2'] - comparison['Total_kWh_Year1']
+year1_monthly, year2_monthly = monthly
+
+# Align the two years on the shared Month index for comparison
+comparison = year1_monthly.add_suffix('_Year1').join(year2_monthly.add_suffix('_Year2'))
+
+# Calculate differences (columns line up as Elec, Gas, Total in both years)
+comparison[['Elec_Change_kWh', 'Gas_Change_kWh', 'Total_Change_kWh']] = (
+    comparison.filter(like='_Year2').values - comparison.filter(like='_Year1').values
+)
+comparison = comparison.reset_index()
 
 # Month names
 month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
@@ -146,15 +153,21 @@ print('Month  Year 1    Year 2    Change    Non-Routine  Adjusted Year 2')
 print('       (kWh)     (kWh)     (kWh)     Period       (routine)')
 print('-' * 80)
 
-for _, row in comparison.iterrows():
-    month = row['Month_Name']
-    y1 = row['Elec_kWh_Year1']
-    y2 = row['Elec_kWh_Year2']
-    change = row['Elec_Change_kWh']
-    nonroutine = 'YES' if row['Month'] >= 7 else 'NO'
-    adjusted = y1 if row['Month'] >= 7 else y2  # Use Y1 for affected months
-
-    print(f'{month:6} {y1:9,.0f} {y2:9,.0f} {change:9,.0f}   {nonroutine:11}  {adjusted:9,.0f}')
+month_name_col = comparison['Month_Name'].values
+y1_col = comparison['Elec_kWh_Year1'].values
+y2_col = comparison['Elec_kWh_Year2'].values
+change_col = comparison['Elec_Change_kWh'].values
+
+# Non-routine months (Jul-Dec) use Year 1 as the adjusted routine value
+nonroutine_mask = comparison['Month'].values >= 7
+nonroutine_col = np.where(nonroutine_mask, 'YES', 'NO')
+adjusted_col = np.where(nonroutine_mask, y1_col, y2_col)
+
+# Format spec parsed once and reused per row; table emitted in one write
+row_fmt = '{:6} {:9,.0f} {:9,.0f} {:9,.0f}   {:11}  {:9,.0f}'.format
+rows = [row_fmt(*row) for row in zip(month_name_col, y1_col, y2_col, change_col,
+                                     nonroutine_col, adjusted_col)]
+sys.stdout.write('\n'.join(rows) + '\n')
 
 print('=' * 80)
 print()
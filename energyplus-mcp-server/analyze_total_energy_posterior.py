@@ -4,10 +4,23 @@ Analyze the posterior distribution for total annual energy consumption
 """
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import arviz as az
+import xarray as xr
 from pathlib import Path
 
+KDEPY_AVAILABLE = False
+try:
+    from KDEpy import FFTKDE
+    KDEPY_AVAILABLE = True
+except ImportError:
+    from scipy.signal import fftconvolve
+
+NUMBA_AVAILABLE = False
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    pass
+
 output_dir = Path("/workspace/energyplus-mcp-server/bayesian_calibration_results")
 trace_file = output_dir / "posterior_trace.nc"
 
@@ -15,20 +28,23 @@ print("=" * 80)
 print("POSTERIOR DISTRIBUTION FOR TOTAL ANNUAL ENERGY CONSUMPTION")
 print("=" * 80)
 
-# Load the trace
+# Open the posterior group lazily; only the variables read below are loaded
 print("\nLoading posterior trace...")
-trace = az.from_netcdf(trace_file)
+posterior = xr.open_dataset(trace_file, group="posterior")
 
 # Extract posterior samples for all parameters
 print("Extracting posterior samples...")
-wall_r_samples = trace.posterior["wall_r_value"].values.flatten()
-roof_r_samples = trace.posterior["roof_r_value"].values.flatten()
-window_u_samples = trace.posterior["window_u_factor"].values.flatten()
-infiltration_samples = trace.posterior["infiltration_ach"].values.flatten()
-heating_eff_samples = trace.posterior["heating_efficiency"].values.flatten()
-cooling_cop_samples = trace.posterior["cooling_cop"].values.flatten()
-lpd_samples = trace.posterior["lighting_power_density"].values.flatten()
-occupants_samples = trace.posterior["occupant_count"].values.flatten()
+param_names = ["wall_r_value", "roof_r_value", "window_u_factor", "infiltration_ach",
+               "heating_efficiency", "cooling_cop", "lighting_power_density",
+               "occupant_count"]
+# One (n_params, n_samples) block; reshape(-1) is a view, so each variable is
+# copied exactly once and each row stays contiguous for the energy kernel
+posterior_samples = np.stack([posterior[name].values.reshape(-1)
+                              for name in param_names])
+posterior.close()
+(wall_r_samples, roof_r_samples, window_u_samples, infiltration_samples,
+ heating_eff_samples, cooling_cop_samples, lpd_samples,
+ occupants_samples) = posterior_samples
 
 n_samples = len(wall_r_samples)
 print(f"Number of posterior samples: {n_samples}")
@@ -45,32 +61,60 @@ hdd_monthly = np.array([1100, 950, 800, 450, 200, 50,
 cdd_monthly = np.array([0, 0, 0, 10, 80, 250,
                        400, 350, 150, 20, 0, 0])
 
-print("\nCalculating total annual energy for each posterior sample...")
-
-# Calculate total annual energy for each posterior sample
-total_energy_samples = np.zeros(n_samples)
-
-for i in range(n_samples):
-    # Convert R-values to U-factors
-    wall_u = 1.0 / wall_r_samples[i]
-    roof_u = 1.0 / roof_r_samples[i]
-
-    # Total UA value (includes infiltration effect)
-    ua_total = (wall_u * wall_area + roof_u * roof_area +
-               window_u_samples[i] * window_area) * (1 + infiltration_samples[i] * 0.1)
-
-    # Annual heating energy (kWh)
-    heating_annual = (ua_total * hdd_monthly.sum() * 24) / heating_eff_samples[i] / 3412
-
-    # Annual cooling energy (kWh)
-    cooling_annual = (ua_total * cdd_monthly.sum() * 24) / cooling_cop_samples[i] / 3412
+# Scalar constants hoisted out of the per-sample arithmetic
+dd_btu_to_kwh = 24.0 / 3412.0            # hours/day / (Btu per kWh): UA*degree-days in Btu -> kWh
+lighting_monthly_per_lpd = floor_area * 730 / 1000
+plug_monthly_per_occupant = 100
+
+
+def compute_energies(wall_r, roof_r, window_u, infiltration, heating_eff,
+                     cooling_cop, lpd, occupants, hdd, cdd):
+    """Annual (n,) and monthly (n, 12) energy in kWh for each posterior sample."""
+    # Total UA value (includes infiltration effect); R-values converted to U-factors
+    ua_total = (wall_area / wall_r + roof_area / roof_r +
+                window_u * window_area) * (1 + infiltration * 0.1)
+
+    # Broadcast (n, 1) per-sample terms against (12,) monthly degree-days
+    heating_coef = (ua_total * dd_btu_to_kwh / heating_eff)[:, None]
+    cooling_coef = (ua_total * dd_btu_to_kwh / cooling_cop)[:, None]
+    internal_monthly = lpd * lighting_monthly_per_lpd + occupants * plug_monthly_per_occupant
+    monthly = heating_coef * hdd + cooling_coef * cdd + internal_monthly[:, None]
+
+    # 12 x 730 h = 8760 h, so the annual total is exactly the sum of the months
+    total = monthly.sum(axis=1)
+
+    return total, monthly
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def compute_energies(wall_r, roof_r, window_u, infiltration, heating_eff,
+                         cooling_cop, lpd, occupants, hdd, cdd):
+        """Fused, multi-threaded twin of the NumPy version (no temporaries)."""
+        n = wall_r.shape[0]
+        n_months = hdd.shape[0]
+        total = np.empty(n)
+        monthly = np.empty((n, n_months))
+        for i in prange(n):
+            ua = (wall_area / wall_r[i] + roof_area / roof_r[i] +
+                  window_u[i] * window_area) * (1 + infiltration[i] * 0.1)
+            heating_coef = ua * dd_btu_to_kwh / heating_eff[i]
+            cooling_coef = ua * dd_btu_to_kwh / cooling_cop[i]
+            internal = lpd[i] * lighting_monthly_per_lpd + occupants[i] * plug_monthly_per_occupant
+            annual = 0.0
+            for m in range(n_months):
+                e = heating_coef * hdd[m] + cooling_coef * cdd[m] + internal
+                monthly[i, m] = e
+                annual += e
+            total[i] = annual
+        return total, monthly
 
-    # Internal gains (annual kWh)
-    lighting_annual = lpd_samples[i] * floor_area * 8760 / 1000
-    plug_loads_annual = occupants_samples[i] * 100 * 12
 
-    # Total annual energy
-    total_energy_samples[i] = heating_annual + cooling_annual + lighting_annual + plug_loads_annual
+print("\nCalculating total annual energy for each posterior sample...")
+total_energy_samples, monthly_energy_samples = compute_energies(
+    wall_r_samples, roof_r_samples, window_u_samples, infiltration_samples,
+    heating_eff_samples, cooling_cop_samples, lpd_samples, occupants_samples,
+    hdd_monthly.astype(np.float64), cdd_monthly.astype(np.float64))
 
 print("\n" + "=" * 80)
 print("POSTERIOR STATISTICS FOR TOTAL ANNUAL ENERGY")
@@ -78,12 +122,13 @@ print("=" * 80)
 
 mean_energy = np.mean(total_energy_samples)
 std_energy = np.std(total_energy_samples)
-median_energy = np.median(total_energy_samples)
 
-# Calculate credible intervals
-ci_50 = np.percentile(total_energy_samples, [25, 75])
-ci_90 = np.percentile(total_energy_samples, [5, 95])
-ci_95 = np.percentile(total_energy_samples, [2.5, 97.5])
+# Median and credible intervals from a single quantile pass
+qs = np.quantile(total_energy_samples, [0.025, 0.05, 0.25, 0.5, 0.75, 0.95, 0.975])
+ci_95 = qs[[0, 6]]
+ci_90 = qs[[1, 5]]
+ci_50 = qs[[2, 4]]
+median_energy = qs[3]
 
 print(f"\nPosterior Mean:   {mean_energy:,.0f} kWh/year")
 print(f"Posterior Median: {median_energy:,.0f} kWh/year")
@@ -117,8 +162,9 @@ print(f"  50% CI: {'Yes ✓' if in_50ci else 'No ✗'}")
 print(f"  90% CI: {'Yes ✓' if in_90ci else 'No ✗'}")
 print(f"  95% CI: {'Yes ✓' if in_95ci else 'No ✗'}")
 
-# Calculate posterior predictive percentile
-percentile = (np.sum(total_energy_samples <= measured_annual) / n_samples) * 100
+# Calculate posterior predictive percentile (sorted once, reused for the CDF plot)
+sorted_samples = np.sort(total_energy_samples)
+percentile = np.searchsorted(sorted_samples, measured_annual, side='right') / n_samples * 100
 print(f"\nMeasured value is at the {percentile:.1f}th percentile of the posterior")
 
 # ============================================================================
@@ -129,21 +175,40 @@ print("\n" + "=" * 80)
 print("CREATING VISUALIZATIONS")
 print("=" * 80)
 
+import matplotlib.pyplot as plt
+plt.rcParams['path.simplify_threshold'] = 1.0
+
 fig_dir = output_dir / "figures"
 
+# One Figure reused for all four plots (cleared between them) so the backend
+# and font cache are only set up once
+fig = plt.figure(figsize=(10, 6))
+
 # 1. Posterior distribution of total energy
 print("\n1. Posterior distribution of total annual energy...")
-fig, ax = plt.subplots(figsize=(10, 6))
+fig.set_size_inches(10, 6)
+ax = fig.add_subplot(111)
 
 # Histogram
 ax.hist(total_energy_samples, bins=50, alpha=0.6, color='steelblue',
         density=True, edgecolor='black', linewidth=0.5)
 
-# Add KDE (kernel density estimate)
-from scipy.stats import gaussian_kde
-kde = gaussian_kde(total_energy_samples)
-x_range = np.linspace(total_energy_samples.min(), total_energy_samples.max(), 200)
-ax.plot(x_range, kde(x_range), 'b-', linewidth=2, label='Posterior PDF')
+# Add KDE (kernel density estimate), binned and FFT-convolved: O((n + m) log m)
+if KDEPY_AVAILABLE:
+    x_range, pdf = FFTKDE(bw='silverman').fit(total_energy_samples).evaluate(1024)
+else:
+    # Silverman's rule, then convolve a fine histogram with a sampled Gaussian
+    iqr = ci_50[1] - ci_50[0]
+    bw = 0.9 * min(std_energy, iqr / 1.34) * n_samples ** (-0.2)
+    counts, edges = np.histogram(total_energy_samples, bins=1024,
+                                 range=(total_energy_samples.min() - 3 * bw,
+                                        total_energy_samples.max() + 3 * bw))
+    dx = edges[1] - edges[0]
+    offsets = np.arange(-int(np.ceil(3 * bw / dx)), int(np.ceil(3 * bw / dx)) + 1) * dx
+    kernel = np.exp(-0.5 * (offsets / bw) ** 2) / (bw * np.sqrt(2 * np.pi))
+    x_range = 0.5 * (edges[:-1] + edges[1:])
+    pdf = fftconvolve(counts / n_samples, kernel, mode='same')
+ax.plot(x_range, pdf, 'b-', linewidth=2, label='Posterior PDF')
 
 # Add vertical lines
 ax.axvline(mean_energy, color='blue', linestyle='-', linewidth=2,
@@ -163,19 +228,21 @@ ax.set_title('Posterior Distribution of Total Annual Energy Consumption', fontsi
 ax.legend(loc='upper right')
 ax.grid(alpha=0.3)
 
-plt.tight_layout()
-plt.savefig(fig_dir / "total_energy_posterior.png", dpi=150, bbox_inches='tight')
+fig.tight_layout()
+fig.savefig(fig_dir / "total_energy_posterior.png", dpi=150, bbox_inches='tight')
 print(f"   Saved to: {fig_dir / 'total_energy_posterior.png'}")
-plt.close()
+fig.clear()
 
 # 2. Cumulative distribution
 print("\n2. Cumulative distribution function...")
-fig, ax = plt.subplots(figsize=(10, 6))
+fig.set_size_inches(10, 6)
+ax = fig.add_subplot(111)
 
-sorted_samples = np.sort(total_energy_samples)
-cumulative = np.arange(1, n_samples + 1) / n_samples
+# The curve has no detail beyond ~2,000 vertices; plot a fixed probability grid
+cdf_probs = np.linspace(0, 1, min(2000, n_samples))
+cdf_x = np.quantile(sorted_samples, cdf_probs)
 
-ax.plot(sorted_samples, cumulative * 100, 'b-', linewidth=2)
+ax.plot(cdf_x, cdf_probs * 100, 'b-', linewidth=2)
 ax.axvline(measured_annual, color='red', linestyle='--', linewidth=2,
            label=f'Measured: {measured_annual:,} kWh ({percentile:.1f}th percentile)')
 ax.axhline(50, color='gray', linestyle=':', alpha=0.5)
@@ -183,8 +250,7 @@ ax.axhline(90, color='gray', linestyle=':', alpha=0.5)
 ax.axhline(95, color='gray', linestyle=':', alpha=0.5)
 
 # Mark key percentiles
-for p, label in [(2.5, '2.5%'), (25, '25%'), (50, '50%'), (75, '75%'), (97.5, '97.5%')]:
-    val = np.percentile(total_energy_samples, p)
+for p, val in zip([2.5, 25, 50, 75, 97.5], qs[[0, 2, 3, 4, 6]]):
     ax.plot(val, p, 'ro', markersize=8)
     ax.text(val, p + 3, f'{val:,.0f} kWh', ha='center', fontsize=9)
 
@@ -194,30 +260,16 @@ ax.set_title('Cumulative Distribution of Total Annual Energy', fontsize=14, font
 ax.legend()
 ax.grid(alpha=0.3)
 
-plt.tight_layout()
-plt.savefig(fig_dir / "total_energy_cdf.png", dpi=150, bbox_inches='tight')
+fig.tight_layout()
+fig.savefig(fig_dir / "total_energy_cdf.png", dpi=150, bbox_inches='tight')
 print(f"   Saved to: {fig_dir / 'total_energy_cdf.png'}")
-plt.close()
+fig.clear()
 
 # 3. Monthly energy posterior distributions
 print("\n3. Monthly energy posterior distributions...")
-monthly_energy_samples = np.zeros((n_samples, 12))
-
-for i in range(n_samples):
-    wall_u = 1.0 / wall_r_samples[i]
-    roof_u = 1.0 / roof_r_samples[i]
-    ua_total = (wall_u * wall_area + roof_u * roof_area +
-               window_u_samples[i] * window_area) * (1 + infiltration_samples[i] * 0.1)
-
-    for month in range(12):
-        heating = (ua_total * hdd_monthly[month] * 24) / heating_eff_samples[i] / 3412
-        cooling = (ua_total * cdd_monthly[month] * 24) / cooling_cop_samples[i] / 3412
-        lighting = lpd_samples[i] * floor_area * 730 / 1000
-        plugs = occupants_samples[i] * 100
-        monthly_energy_samples[i, month] = heating + cooling + lighting + plugs
-
 # Create violin plot for monthly distributions
-fig, ax = plt.subplots(figsize=(14, 6))
+fig.set_size_inches(14, 6)
+ax = fig.add_subplot(111)
 
 months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
@@ -227,7 +279,12 @@ measured_monthly = np.array([2152, 1937, 1703, 1453, 1186, 1334,
                             1780, 1558, 1172, 1387, 1612, 1905])
 
 positions = np.arange(len(months))
-parts = ax.violinplot([monthly_energy_samples[:, i] for i in range(12)],
+# Violin KDEs are the dominant plotting cost; a 5,000-draw subsample is
+# visually indistinguishable from the full posterior
+rng = np.random.default_rng(0)
+violin_idx = rng.choice(n_samples, size=min(5000, n_samples), replace=False)
+violin_samples = monthly_energy_samples[violin_idx]
+parts = ax.violinplot([violin_samples[:, i] for i in range(12)],
                       positions=positions, widths=0.7,
                       showmeans=True, showmedians=True)
 
@@ -248,14 +305,15 @@ ax.set_xticklabels(months)
 ax.legend()
 ax.grid(alpha=0.3, axis='y')
 
-plt.tight_layout()
-plt.savefig(fig_dir / "monthly_energy_posterior.png", dpi=150, bbox_inches='tight')
+fig.tight_layout()
+fig.savefig(fig_dir / "monthly_energy_posterior.png", dpi=150, bbox_inches='tight')
 print(f"   Saved to: {fig_dir / 'monthly_energy_posterior.png'}")
-plt.close()
+fig.clear()
 
 # 4. Box plot summary
 print("\n4. Summary statistics box plot...")
-fig, ax = plt.subplots(figsize=(8, 6))
+fig.set_size_inches(8, 6)
+ax = fig.add_subplot(111)
 
 bp = ax.boxplot([total_energy_samples], widths=0.6, patch_artist=True,
                 labels=['Total Annual Energy'])
@@ -276,10 +334,10 @@ ax.set_title('Posterior Distribution Summary', fontsize=14, fontweight='bold')
 ax.legend()
 ax.grid(alpha=0.3, axis='y')
 
-plt.tight_layout()
-plt.savefig(fig_dir / "total_energy_boxplot.png", dpi=150, bbox_inches='tight')
+fig.tight_layout()
+fig.savefig(fig_dir / "total_energy_boxplot.png", dpi=150, bbox_inches='tight')
 print(f"   Saved to: {fig_dir / 'total_energy_boxplot.png'}")
-plt.close()
+plt.close(fig)
 
 # ============================================================================
 # SAVE RESULTS
@@ -290,12 +348,14 @@ print("SAVING RESULTS")
 print("=" * 80)
 
 # Save total energy posterior samples
-np.save(output_dir / "total_energy_posterior_samples.npy", total_energy_samples)
+# (float32 is ample: ~7 significant digits vs. a posterior CV of several percent)
+np.save(output_dir / "total_energy_posterior_samples.npy", total_energy_samples.astype(np.float32))
 print(f"\n✓ Posterior samples saved to: {output_dir / 'total_energy_posterior_samples.npy'}")
 
-# Save monthly energy posterior samples
-np.save(output_dir / "monthly_energy_posterior_samples.npy", monthly_energy_samples)
-print(f"✓ Monthly posterior samples saved to: {output_dir / 'monthly_energy_posterior_samples.npy'}")
+# Save monthly energy posterior samples (12x larger, so also compressed)
+np.savez_compressed(output_dir / "monthly_energy_posterior_samples.npz",
+                    monthly=monthly_energy_samples.astype(np.float32))
+print(f"✓ Monthly posterior samples saved to: {output_dir / 'monthly_energy_posterior_samples.npz'}")
 
 # Save summary statistics
 summary_stats = {
@@ -13,10 +13,288 @@ WORKFLOW:
 This follows ASHRAE Guideline 14 and IPMVP protocols
 """
 
+import hashlib
 import json
+import sys
 import numpy as np
 from pathlib import Path
-from datetime import datetime
+from datetime import date
+from types import MappingProxyType
+
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
+
+def _freeze(obj):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(item) for item in obj)
+    return obj
+
+
+# Audit payloads are fixed inputs, so they are built once at import time and
+# frozen all the way down; the collect_* methods share them safely
+
+# Basic building information
+_BUILDING_INFO = _freeze({
+    "building_name": "Example Office Building",
+    "address": "123 Main St, Chicago, IL",
+    "building_type": "Office",
+    "year_built": 1995,
+    "gross_area_sqft": 25000,
+    "conditioned_area_sqft": 23500,
+    "num_floors": 3,
+    "floor_to_floor_height_ft": 13,
+    "operating_hours": {
+        "weekday": "7:00 AM - 6:00 PM",
+        "saturday": "Closed",
+        "sunday": "Closed"
+    },
+    "num_occupants": 75
+})
+
+# Building envelope characteristics
+_ENVELOPE_DATA = _freeze({
+    "walls": {
+        "construction": "Brick veneer with batt insulation",
+        "r_value": 11,  # hr-ft²-°F/BTU
+        "measured_thickness_inches": 10,
+        "condition": "Fair - some air leakage noted"
+    },
+    "roof": {
+        "construction": "Built-up roof with rigid insulation",
+        "r_value": 15,
+        "age_years": 15,
+        "condition": "Good"
+    },
+    "windows": {
+        "type": "Double-pane, aluminum frame",
+        "u_factor": 0.55,  # BTU/hr-ft²-°F
+        "shgc": 0.60,  # Solar Heat Gain Coefficient
+        "window_to_wall_ratio": 0.35,
+        "condition": "Original, some seal failures"
+    },
+    "infiltration": {
+        "blower_door_test": False,
+        "estimated_ach50": 12,  # Air Changes per Hour at 50 Pa
+        "notes": "Visible gaps around doors, windows"
+    }
+})
+
+# HVAC system information
+_HVAC_DATA = _freeze({
+    "system_type": "Packaged Rooftop Units (RTUs)",
+    "units": [
+        {
+            "unit_id": "RTU-1",
+            "serves": "Floors 1-2",
+            "capacity_tons": 15,
+            "manufacturer": "Carrier",
+            "model": "48TFE015",
+            "year_installed": 2005,
+            "efficiency_eer": 10.5,
+            "heating_type": "Natural gas furnace",
+            "heating_efficiency_afue": 0.80,
+            "condition": "Fair - maintenance irregular",
+            "economizer": True,
+            "economizer_working": False  # Noted during audit!
+        },
+        {
+            "unit_id": "RTU-2",
+            "serves": "Floor 3",
+            "capacity_tons": 10,
+            "manufacturer": "Trane",
+            "model": "YCD120",
+            "year_installed": 2008,
+            "efficiency_eer": 11.0,
+            "heating_type": "Natural gas furnace",
+            "heating_efficiency_afue": 0.82,
+            "condition": "Good",
+            "economizer": True,
+            "economizer_working": True
+        }
+    ],
+    "thermostat_schedule": {
+        "occupied_cooling_setpoint_f": 73,
+        "occupied_heating_setpoint_f": 70,
+        "unoccupied_cooling_setpoint_f": 78,
+        "unoccupied_heating_setpoint_f": 65
+    },
+    "duct_leakage": {
+        "tested": False,
+        "estimated_leakage_pct": 15,  # Typical for older systems
+        "notes": "Visible gaps at connections, poor sealing"
+    }
+})
+
+# Lighting system inventory
+_LIGHTING_DATA = _freeze({
+    "spaces": [
+        {
+            "space_type": "Open Office",
+            "area_sqft": 15000,
+            "fixture_type": "2x4 T8 fluorescent troffer",
+            "lamps_per_fixture": 3,
+            "watts_per_lamp": 32,
+            "num_fixtures": 300,
+            "total_watts": 28800,
+            "lpd_w_per_sqft": 1.92,
+            "hours_per_day": 10,
+            "occupancy_sensor": False,
+            "daylight_sensor": False
+        },
+        {
+            "space_type": "Private Offices",
+            "area_sqft": 4500,
+            "fixture_type": "2x4 T8 fluorescent",
+            "lamps_per_fixture": 2,
+            "watts_per_lamp": 32,
+            "num_fixtures": 90,
+            "total_watts": 5760,
+            "lpd_w_per_sqft": 1.28,
+            "hours_per_day": 10,
+            "occupancy_sensor": False,
+            "daylight_sensor": False
+        },
+        {
+            "space_type": "Corridors/Restrooms",
+            "area_sqft": 2500,
+            "fixture_type": "2x2 T8 fluorescent",
+            "lamps_per_fixture": 2,
+            "watts_per_lamp": 17,
+            "num_fixtures": 50,
+            "total_watts": 1700,
+            "lpd_w_per_sqft": 0.68,
+            "hours_per_day": 12,  # Longer hours
+            "occupancy_sensor": False,
+            "daylight_sensor": False
+        },
+        {
+            "space_type": "Parking Lot",
+            "area_sqft": 30000,
+            "fixture_type": "Metal Halide pole lights",
+            "watts_per_fixture": 400,
+            "num_fixtures": 12,
+            "total_watts": 4800,
+            "hours_per_day": 12,  # Dusk to dawn
+            "condition": "Poor efficiency, frequent failures"
+        }
+    ],
+    "total_interior_lpd": 1.54,  # W/sqft weighted average
+    "control_issues": [
+        "Many lights left on after hours",
+        "No automatic shutoff",
+        "Occupancy sensors not used"
+    ]
+})
+
+# Plug loads and equipment
+_EQUIPMENT_DATA = _freeze({
+    "office_equipment": {
+        "computers": 75,
+        "watts_per_computer": 150,
+        "monitors": 75,
+        "watts_per_monitor": 50,
+        "printers_copiers": 8,
+        "watts_per_unit": 500,
+        "usage_hours_per_day": 9
+    },
+    "kitchen_breakroom": {
+        "refrigerators": 3,
+        "microwaves": 2,
+        "coffee_makers": 2,
+        "vending_machines": 2
+    },
+    "estimated_plug_load_density": 1.2,  # W/sqft
+    "notes": "Equipment left on 24/7, no power management"
+})
+
+# Occupancy patterns
+_OCCUPANCY_DATA = _freeze({
+    "typical_weekday": {
+        "peak_occupancy": 75,
+        "peak_time": "10:00 AM - 3:00 PM",
+        "arrival_time": "7:00 AM - 9:00 AM",
+        "departure_time": "4:00 PM - 6:00 PM"
+    },
+    "weekend": "Closed - security only",
+    "holidays": 10,  # days per year
+    "density_people_per_1000sqft": 3.2
+})
+
+# Utility bills as (month, quantity, cost) rows
+_MONTHLY_KWH = (
+    # Month, kWh, Cost
+    ("2024-01", 28500, 3420),
+    ("2024-02", 26800, 3216),
+    ("2024-03", 29200, 3504),
+    ("2024-04", 31500, 3780),
+    ("2024-05", 36800, 4416),
+    ("2024-06", 42500, 5100),
+    ("2024-07", 48200, 5784),
+    ("2024-08", 47800, 5736),
+    ("2024-09", 39500, 4740),
+    ("2024-10", 33200, 3984),
+    ("2024-11", 30500, 3660),
+    ("2024-12", 29800, 3576)
+)
+
+_MONTHLY_THERMS = (
+    # Month, Therms, Cost
+    ("2024-01", 2850, 3135),
+    ("2024-02", 2650, 2915),
+    ("2024-03", 2150, 2365),
+    ("2024-04", 1200, 1320),
+    ("2024-05", 450, 495),
+    ("2024-06", 280, 308),
+    ("2024-07", 250, 275),
+    ("2024-08", 240, 264),
+    ("2024-09", 380, 418),
+    ("2024-10", 950, 1045),
+    ("2024-11", 1850, 2035),
+    ("2024-12", 2680, 2948)
+)
+
+# Annual totals folded from the bills once at import
+_ANNUAL_KWH = sum(row[1] for row in _MONTHLY_KWH)
+_ANNUAL_ELEC_COST = sum(row[2] for row in _MONTHLY_KWH)
+_ANNUAL_THERMS = sum(row[1] for row in _MONTHLY_THERMS)
+_ANNUAL_GAS_COST = sum(row[2] for row in _MONTHLY_THERMS)
+
+# 12 months of utility bills
+_UTILITY_DATA = _freeze({
+    "electricity": {
+        "utility": "ComEd",
+        "account": "1234567890",
+        "rate_structure": "Commercial - Time of Use",
+        "monthly_kwh": _MONTHLY_KWH,
+        "annual_kwh": _ANNUAL_KWH,
+        "annual_cost": _ANNUAL_ELEC_COST,
+        "avg_rate_per_kwh": 0.12,
+        "demand_charges": "Yes - $15/kW peak"
+    },
+    "natural_gas": {
+        "utility": "Peoples Gas",
+        "account": "9876543210",
+        "monthly_therms": _MONTHLY_THERMS,
+        "annual_therms": _ANNUAL_THERMS,
+        "annual_cost": _ANNUAL_GAS_COST,
+        "avg_rate_per_therm": 1.10
+    }
+})
+
+
+def _json_default(obj):
+    """Serialize the read-only payload views."""
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 class EnergyAuditData:
     """
@@ -24,322 +302,137 @@ class EnergyAuditData:
     This represents what you'd gather during a site visit
     """
 
+    __slots__ = ("audit_date",)
+
     def __init__(self):
-        self.audit_date = datetime.now().strftime("%Y-%m-%d")
-        self.building_info = {}
-        self.envelope = {}
-        self.hvac = {}
-        self.lighting = {}
-        self.equipment = {}
-        self.occupancy = {}
-        self.utility_data = {}
+        self.audit_date = date.today().isoformat()
 
     def collect_building_info(self):
         """Basic building information"""
-        return {
-            "building_name": "Example Office Building",
-            "address": "123 Main St, Chicago, IL",
-            "building_type": "Office",
-            "year_built": 1995,
-            "gross_area_sqft": 25000,
-            "conditioned_area_sqft": 23500,
-            "num_floors": 3,
-            "floor_to_floor_height_ft": 13,
-            "operating_hours": {
-                "weekday": "7:00 AM - 6:00 PM",
-                "saturday": "Closed",
-                "sunday": "Closed"
-            },
-            "num_occupants": 75
-        }
+        return _BUILDING_INFO
 
     def collect_envelope_data(self):
         """Building envelope characteristics"""
-        return {
-            "walls": {
-                "construction": "Brick veneer with batt insulation",
-                "r_value": 11,  # hr-ft²-°F/BTU
-                "measured_thickness_inches": 10,
-                "condition": "Fair - some air leakage noted"
-            },
-            "roof": {
-                "construction": "Built-up roof with rigid insulation",
-                "r_value": 15,
-                "age_years": 15,
-                "condition": "Good"
-            },
-            "windows": {
-                "type": "Double-pane, aluminum frame",
-                "u_factor": 0.55,  # BTU/hr-ft²-°F
-                "shgc": 0.60,  # Solar Heat Gain Coefficient
-                "window_to_wall_ratio": 0.35,
-                "condition": "Original, some seal failures"
-            },
-            "infiltration": {
-                "blower_door_test": False,
-                "estimated_ach50": 12,  # Air Changes per Hour at 50 Pa
-                "notes": "Visible gaps around doors, windows"
-            }
-        }
+        return _ENVELOPE_DATA
 
     def collect_hvac_data(self):
         """HVAC system information"""
-        return {
-            "system_type": "Packaged Rooftop Units (RTUs)",
-            "units": [
-                {
-                    "unit_id": "RTU-1",
-                    "serves": "Floors 1-2",
-                    "capacity_tons": 15,
-                    "manufacturer": "Carrier",
-                    "model": "48TFE015",
-                    "year_installed": 2005,
-                    "efficiency_eer": 10.5,
-                    "heating_type": "Natural gas furnace",
-                    "heating_efficiency_afue": 0.80,
-                    "condition": "Fair - maintenance irregular",
-                    "economizer": True,
-                    "economizer_working": False  # Noted during audit!
-                },
-                {
-                    "unit_id": "RTU-2",
-                    "serves": "Floor 3",
-                    "capacity_tons": 10,
-                    "manufacturer": "Trane",
-                    "model": "YCD120",
-                    "year_installed": 2008,
-                    "efficiency_eer": 11.0,
-                    "heating_type": "Natural gas furnace",
-                    "heating_efficiency_afue": 0.82,
-                    "condition": "Good",
-                    "economizer": True,
-                    "economizer_working": True
-                }
-            ],
-            "thermostat_schedule": {
-                "occupied_cooling_setpoint_f": 73,
-                "occupied_heating_setpoint_f": 70,
-                "unoccupied_cooling_setpoint_f": 78,
-                "unoccupied_heating_setpoint_f": 65
-            },
-            "duct_leakage": {
-                "tested": False,
-                "estimated_leakage_pct": 15,  # Typical for older systems
-                "notes": "Visible gaps at connections, poor sealing"
-            }
-        }
+        return _HVAC_DATA
 
     def collect_lighting_data(self):
         """Lighting system inventory"""
-        return {
-            "spaces": [
-                {
-                    "space_type": "Open Office",
-                    "area_sqft": 15000,
-                    "fixture_type": "2x4 T8 fluorescent troffer",
-                    "lamps_per_fixture": 3,
-                    "watts_per_lamp": 32,
-                    "num_fixtures": 300,
-                    "total_watts": 28800,
-                    "lpd_w_per_sqft": 1.92,
-                    "hours_per_day": 10,
-                    "occupancy_sensor": False,
-                    "daylight_sensor": False
-                },
-                {
-                    "space_type": "Private Offices",
-                    "area_sqft": 4500,
-                    "fixture_type": "2x4 T8 fluorescent",
-                    "lamps_per_fixture": 2,
-                    "watts_per_lamp": 32,
-                    "num_fixtures": 90,
-                    "total_watts": 5760,
-                    "lpd_w_per_sqft": 1.28,
-                    "hours_per_day": 10,
-                    "occupancy_sensor": False,
-                    "daylight_sensor": False
-                },
-                {
-                    "space_type": "Corridors/Restrooms",
-                    "area_sqft": 2500,
-                    "fixture_type": "2x2 T8 fluorescent",
-                    "lamps_per_fixture": 2,
-                    "watts_per_lamp": 17,
-                    "num_fixtures": 50,
-                    "total_watts": 1700,
-                    "lpd_w_per_sqft": 0.68,
-                    "hours_per_day": 12,  # Longer hours
-                    "occupancy_sensor": False,
-                    "daylight_sensor": False
-                },
-                {
-                    "space_type": "Parking Lot",
-                    "area_sqft": 30000,
-                    "fixture_type": "Metal Halide pole lights",
-                    "watts_per_fixture": 400,
-                    "num_fixtures": 12,
-                    "total_watts": 4800,
-                    "hours_per_day": 12,  # Dusk to dawn
-                    "condition": "Poor efficiency, frequent failures"
-                }
-            ],
-            "total_interior_lpd": 1.54,  # W/sqft weighted average
-            "control_issues": [
-                "Many lights left on after hours",
-                "No automatic shutoff",
-                "Occupancy sensors not used"
-            ]
-        }
+        return _LIGHTING_DATA
 
     def collect_equipment_data(self):
         """Plug loads and equipment"""
-        return {
-            "office_equipment": {
-                "computers": 75,
-                "watts_per_computer": 150,
-                "monitors": 75,
-                "watts_per_monitor": 50,
-                "printers_copiers": 8,
-                "watts_per_unit": 500,
-                "usage_hours_per_day": 9
-            },
-            "kitchen_breakroom": {
-                "refrigerators": 3,
-                "microwaves": 2,
-                "coffee_makers": 2,
-                "vending_machines": 2
-            },
-            "estimated_plug_load_density": 1.2,  # W/sqft
-            "notes": "Equipment left on 24/7, no power management"
-        }
+        return _EQUIPMENT_DATA
 
     def collect_occupancy_data(self):
         """Occupancy patterns"""
-        return {
-            "typical_weekday": {
-                "peak_occupancy": 75,
-                "peak_time": "10:00 AM - 3:00 PM",
-                "arrival_time": "7:00 AM - 9:00 AM",
-                "departure_time": "4:00 PM - 6:00 PM"
-            },
-            "weekend": "Closed - security only",
-            "holidays": 10,  # days per year
-            "density_people_per_1000sqft": 3.2
-        }
+        return _OCCUPANCY_DATA
 
     def collect_utility_data(self):
         """12 months of utility bills"""
-        return {
-            "electricity": {
-                "utility": "ComEd",
-                "account": "1234567890",
-                "rate_structure": "Commercial - Time of Use",
-                "monthly_kwh": [
-                    # Month, kWh, Cost
-                    ("2024-01", 28500, 3420),
-                    ("2024-02", 26800, 3216),
-                    ("2024-03", 29200, 3504),
-                    ("2024-04", 31500, 3780),
-                    ("2024-05", 36800, 4416),
-                    ("2024-06", 42500, 5100),
-                    ("2024-07", 48200, 5784),
-                    ("2024-08", 47800, 5736),
-                    ("2024-09", 39500, 4740),
-                    ("2024-10", 33200, 3984),
-                    ("2024-11", 30500, 3660),
-                    ("2024-12", 29800, 3576)
-                ],
-                "annual_kwh": 424300,
-                "annual_cost": 50916,
-                "avg_rate_per_kwh": 0.12,
-                "demand_charges": "Yes - $15/kW peak"
-            },
-            "natural_gas": {
-                "utility": "Peoples Gas",
-                "account": "9876543210",
-                "monthly_therms": [
-                    # Month, Therms, Cost
-                    ("2024-01", 2850, 3135),
-                    ("2024-02", 2650, 2915),
-                    ("2024-03", 2150, 2365),
-                    ("2024-04", 1200, 1320),
-                    ("2024-05", 450, 495),
-                    ("2024-06", 280, 308),
-                    ("2024-07", 250, 275),
-                    ("2024-08", 240, 264),
-                    ("2024-09", 380, 418),
-                    ("2024-10", 950, 1045),
-                    ("2024-11", 1850, 2035),
-                    ("2024-12", 2680, 2948)
-                ],
-                "annual_therms": 15930,
-                "annual_cost": 17523,
-                "avg_rate_per_therm": 1.10
-            }
-        }
+        return _UTILITY_DATA
 
     def generate_audit_report(self):
         """Compile complete audit data"""
 
-        print("\n" + "="*80)
-        print("ENERGY AUDIT DATA COLLECTION")
-        print("="*80 + "\n")
-
-        audit_data = {
-            "audit_date": self.audit_date,
-            "building": self.collect_building_info(),
-            "envelope": self.collect_envelope_data(),
-            "hvac": self.collect_hvac_data(),
-            "lighting": self.collect_lighting_data(),
-            "equipment": self.collect_equipment_data(),
-            "occupancy": self.collect_occupancy_data(),
-            "utility_data": self.collect_utility_data()
-        }
+        # Report lines are collected and emitted with a single write
+        lines = []
+        lines.append("\n" + "="*80)
+        lines.append("ENERGY AUDIT DATA COLLECTION")
+        lines.append("="*80 + "\n")
 
-        # Save to JSON
+        # The payload depends only on this module's source and the audit date, so
+        # a matching key stored beside the JSON means the file is already current
         output_file = Path("/workspace/energyplus-mcp-server/energy_audit_data.json")
-        with open(output_file, 'w') as f:
-            json.dump(audit_data, f, indent=2)
+        key_file = output_file.with_suffix(".hash")
+        source_key = hashlib.blake2b(Path(__file__).read_bytes() + self.audit_date.encode(),
+                                     digest_size=16).hexdigest()
 
-        print(f"✅ Energy audit data compiled")
-        print(f"   Saved to: {output_file}")
+        if (output_file.exists() and key_file.exists()
+                and key_file.read_text() == source_key):
+            if ORJSON_AVAILABLE:
+                audit_data = orjson.loads(output_file.read_bytes())
+            else:
+                with open(output_file) as f:
+                    audit_data = json.load(f)
+
+            lines.append(f"✅ Energy audit data up to date (cached)")
+            lines.append(f"   Loaded from: {output_file}")
+        else:
+            fresh = {
+                "audit_date": self.audit_date,
+                "building": self.collect_building_info(),
+                "envelope": self.collect_envelope_data(),
+                "hvac": self.collect_hvac_data(),
+                "lighting": self.collect_lighting_data(),
+                "equipment": self.collect_equipment_data(),
+                "occupancy": self.collect_occupancy_data(),
+                "utility_data": self.collect_utility_data()
+            }
+
+            # Save to JSON. The caller gets the payload parsed back from the
+            # written text, i.e. plain (mutable, unshared) dicts and lists,
+            # exactly as on a cache hit
+            if ORJSON_AVAILABLE:
+                # Serialized natively into one buffer and written in a single call
+                payload = orjson.dumps(fresh, default=_json_default, option=orjson.OPT_INDENT_2)
+                output_file.write_bytes(payload)
+                audit_data = orjson.loads(payload)
+            else:
+                payload = json.dumps(fresh, indent=2, default=_json_default)
+                output_file.write_text(payload)
+                audit_data = json.loads(payload)
+            key_file.write_text(source_key)
+
+            lines.append(f"✅ Energy audit data compiled")
+            lines.append(f"   Saved to: {output_file}")
 
         # Print summary
-        print(f"\n📋 BUILDING SUMMARY")
-        print(f"   Name: {audit_data['building']['building_name']}")
-        print(f"   Type: {audit_data['building']['building_type']}")
-        print(f"   Size: {audit_data['building']['gross_area_sqft']:,} sq ft")
-        print(f"   Built: {audit_data['building']['year_built']}")
-
-        print(f"\n💡 ANNUAL ENERGY CONSUMPTION")
-        print(f"   Electricity: {audit_data['utility_data']['electricity']['annual_kwh']:,} kWh")
-        print(f"   Natural Gas: {audit_data['utility_data']['natural_gas']['annual_therms']:,} therms")
-        print(f"   Total Cost: ${audit_data['utility_data']['electricity']['annual_cost'] + audit_data['utility_data']['natural_gas']['annual_cost']:,}")
-
-        print(f"\n📊 ENERGY USE INTENSITY")
-        area = audit_data['building']['gross_area_sqft']
-        elec_eui = audit_data['utility_data']['electricity']['annual_kwh'] / area
-        gas_eui = audit_data['utility_data']['natural_gas']['annual_therms'] * 100 / area  # kBTU/sqft
-        print(f"   Electric: {elec_eui:.1f} kWh/sqft/year")
-        print(f"   Gas: {gas_eui:.1f} kBTU/sqft/year")
-
-        print(f"\n🔍 KEY FINDINGS FROM AUDIT")
-        print(f"   ⚠️  RTU-1 economizer not functional")
-        print(f"   ⚠️  Estimated 15% duct leakage")
-        print(f"   ⚠️  No lighting controls (occupancy/daylight sensors)")
-        print(f"   ⚠️  Equipment left on 24/7 (no power management)")
-        print(f"   ⚠️  Infiltration issues (visible gaps)")
-        print(f"   ⚠️  Old windows (U=0.55, SHGC=0.60)")
-
-        print(f"\n💡 RECOMMENDED ECMs (Energy Conservation Measures)")
-        print(f"   1. Fix RTU-1 economizer")
-        print(f"   2. Seal ductwork (reduce leakage to <5%)")
-        print(f"   3. LED lighting retrofit + occupancy sensors")
-        print(f"   4. Enable computer power management")
-        print(f"   5. Air sealing / weatherization")
-        print(f"   6. Window film or replacement (long-term)")
-
-        print("\n" + "="*80 + "\n")
+        bldg = audit_data['building']
+        elec = audit_data['utility_data']['electricity']
+        gas = audit_data['utility_data']['natural_gas']
+        area = bldg['gross_area_sqft']
+        total_cost = elec['annual_cost'] + gas['annual_cost']
+        elec_eui = elec['annual_kwh'] / area
+        gas_eui = gas['annual_therms'] * 100 / area  # kBTU/sqft
+
+        lines.append(f"\n📋 BUILDING SUMMARY")
+        lines.append(f"   Name: {bldg['building_name']}")
+        lines.append(f"   Type: {bldg['building_type']}")
+        lines.append(f"   Size: {area:,} sq ft")
+        lines.append(f"   Built: {bldg['year_built']}")
+
+        lines.append(f"\n💡 ANNUAL ENERGY CONSUMPTION")
+        lines.append(f"   Electricity: {elec['annual_kwh']:,} kWh")
+        lines.append(f"   Natural Gas: {gas['annual_therms']:,} therms")
+        lines.append(f"   Total Cost: ${total_cost:,}")
+
+        lines.append(f"\n📊 ENERGY USE INTENSITY")
+        lines.append(f"   Electric: {elec_eui:.1f} kWh/sqft/year")
+        lines.append(f"   Gas: {gas_eui:.1f} kBTU/sqft/year")
+
+        lines.append(f"\n🔍 KEY FINDINGS FROM AUDIT")
+        lines.append(f"   ⚠️  RTU-1 economizer not functional")
+        lines.append(f"   ⚠️  Estimated 15% duct leakage")
+        lines.append(f"   ⚠️  No lighting controls (occupancy/daylight sensors)")
+        lines.append(f"   ⚠️  Equipment left on 24/7 (no power management)")
+        lines.append(f"   ⚠️  Infiltration issues (visible gaps)")
+        lines.append(f"   ⚠️  Old windows (U=0.55, SHGC=0.60)")
+
+        lines.append(f"\n💡 RECOMMENDED ECMs (Energy Conservation Measures)")
+        lines.append(f"   1. Fix RTU-1 economizer")
+        lines.append(f"   2. Seal ductwork (reduce leakage to <5%)")
+        lines.append(f"   3. LED lighting retrofit + occupancy sensors")
+        lines.append(f"   4. Enable computer power management")
+        lines.append(f"   5. Air sealing / weatherization")
+        lines.append(f"   6. Window film or replacement (long-term)")
+
+        lines.append("\n" + "="*80 + "\n")
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
         return audit_data
 
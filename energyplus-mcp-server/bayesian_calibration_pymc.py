@@ -16,22 +16,165 @@ import pandas as pd
 from pathlib import Path
 import matplotlib.pyplot as plt
 import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
 
 # MCP Integration - Direct Python imports
 from energyplus_mcp_server.config import get_config
 from energyplus_mcp_server.energyplus_tools import EnergyPlusManager
+from energyplus_mcp_server.utils.tabular_reports import total_site_energy_gj
 
 # Bayesian/ML imports
 try:
     import pymc as pm
     import arviz as az
+    import pytensor
+    import pytensor.tensor as pt
+    from pytensor.graph.op import Op
     from sklearn.gaussian_process import GaussianProcessRegressor
     from sklearn.gaussian_process.kernels import RBF, ConstantKernel as C
+    from scipy.linalg import cho_solve, solve_triangular
+    from scipy.stats import norm, qmc
 except ImportError as e:
     print(f"Missing dependencies: {e}")
     print("Install with: uv pip install pymc arviz scikit-learn")
     exit(1)
 
+NUMBA_AVAILABLE = False
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    pass
+
+
+# Total site energy (GJ) from the annual building utility performance summary
+_TOTAL_SITE_ENERGY_SQL = (
+    "SELECT Value FROM TabularDataWithStrings "
+    "WHERE ReportName='AnnualBuildingUtilityPerformanceSummary' "
+    "AND TableName='Site and Source Energy' "
+    "AND RowName='Total Site Energy' "
+    "AND ColumnName='Total Energy' "
+    "AND Units='GJ' LIMIT 1"
+)
+
+_ELEC_FACILITY_COLUMN = 'Electricity:Facility [J](Hourly)'
+
+
+def _run_one(idf_path: str, weather_file: str, params: dict, run_id: int,
+             manager: EnergyPlusManager = None) -> float:
+    """
+    Apply parameters to a copy of the baseline IDF and simulate it via MCP
+
+    Module-level so it can be shipped to ProcessPoolExecutor workers; each
+    worker builds its own manager unless one is passed in, and writes a
+    run_id-specific IDF.
+
+    Returns:
+        Annual energy consumption (kWh)
+    """
+    if manager is None:
+        manager = EnergyPlusManager(get_config())
+
+    # Create modified IDF with these parameters
+    modified_idf = f"sample_files/calibration_run_{run_id}.idf"
+
+    # Apply infiltration multiplier via MCP
+    manager.change_infiltration_by_mult(
+        idf_path=idf_path,
+        mult=params['infiltration_mult'],
+        output_path=modified_idf
+    )
+
+    # Request SQLite output so the annual total can be read with one query
+    idf_text = Path(modified_idf).read_text()
+    if 'output:sqlite' not in idf_text.lower():
+        with open(modified_idf, 'a') as f:
+            f.write("\nOutput:SQLite,\n    SimpleAndTabular;        !- Option Type\n")
+
+    # TODO: Apply R-value and setpoint modifications
+    # (Would need additional MCP tools or direct IDF manipulation)
+
+    # Run simulation (returns JSON string with results)
+    result_json = manager.run_simulation(
+        idf_path=modified_idf,
+        weather_file=weather_file,
+        annual=True
+    )
+
+    # Parse JSON result
+    result = json.loads(result_json)
+    output_dir = result['output_directory']
+    output_prefix = result.get('simulation_options', {}).get('output_prefix', 'eplusout')
+
+    # Extract annual energy from results
+    return BayesianCalibrator._extract_annual_energy(output_dir, output_prefix)
+
+
+def rbf(X1, X2, length_scale, signal_var):
+    """Squared-exponential kernel matrix between the rows of X1 and X2"""
+    diff = (X1[:, np.newaxis, :] - X2[np.newaxis, :, :]) / length_scale
+    return signal_var * np.exp(-0.5 * (diff * diff).sum(axis=2))
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def rbf(X1, X2, length_scale, signal_var):
+        """Loop twin of the NumPy version (no (n, m, d) temporary)."""
+        out = np.empty((X1.shape[0], X2.shape[0]))
+        for i in range(X1.shape[0]):
+            for j in range(X2.shape[0]):
+                s = 0.0
+                for k in range(X1.shape[1]):
+                    t = (X1[i, k] - X2[j, k]) / length_scale[k]
+                    s += t * t
+                out[i, j] = signal_var * np.exp(-0.5 * s)
+        return out
+
+
+def rbf_predict_one(x, X_train, alpha, length_scale, signal_var):
+    """GP mean at a single point x (1-D), k(x, X_train) @ alpha"""
+    return (rbf(x.reshape(1, -1), X_train, length_scale, signal_var) @ alpha)[0]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def rbf_predict_one(x, X_train, alpha, length_scale, signal_var):
+        """Fused loop twin of the NumPy version (no kernel row temporary)."""
+        acc = 0.0
+        for j in range(X_train.shape[0]):
+            q = 0.0
+            for k in range(X_train.shape[1]):
+                t = (x[k] - X_train[j, k]) / length_scale[k]
+                q += t * t
+            acc += alpha[j] * np.exp(-0.5 * q)
+        return acc * signal_var
+
+
+class GPSurrogateOp(Op):
+    """
+    PyTensor Op computing the GP posterior mean at one parameter vector
+
+    The training inputs, weights, kernel hyperparameters and y scaling are
+    graph inputs (shared variables on the calibrator), so a refit only swaps
+    their values and the model graph never has to be rebuilt. The Op has no
+    gradient, so PyMC assigns a gradient-free step method.
+    """
+
+    __props__ = ()
+
+    itypes = [pt.dvector, pt.dmatrix, pt.dvector, pt.dvector,
+              pt.dscalar, pt.dscalar, pt.dscalar]
+    otypes = [pt.dscalar]
+
+    def perform(self, node, inputs, outputs):
+        x, X_train, alpha, length_scale, signal_var, y_mean, y_std = inputs
+        # Called once per log-density evaluation with a single point
+        mean = rbf_predict_one(x, X_train, alpha, length_scale, float(signal_var))
+        outputs[0][0] = np.asarray(mean * y_std + y_mean, dtype=np.float64)
+
 
 class BayesianCalibrator:
     """
@@ -62,12 +205,21 @@ class BayesianCalibrator:
             'thermostat_setpoint': (68, 76),  # °F setpoint range
             'infiltration_mult': (0.5, 2.0),  # 50% to 200% infiltration
         }
+        self._lb = np.array([self.param_bounds[name][0] for name in self.param_names])
+        self._ub = np.array([self.param_bounds[name][1] for name in self.param_names])
+        # Rounding grid used to spot near-duplicate GP training points
+        self._dedup_tol = np.array([0.01, 0.1, 0.01])
 
         # GP surrogate model storage
         self.X_train = []  # Parameter samples
         self.y_train = []  # Energy results (kWh)
         self.gp = None
 
+        # Shared copies of the GP factors read by the sampler graph, and the
+        # PyMC model built on them (reused across inference calls)
+        self._gp_shared = None
+        self._model = None
+
         # Simulation counter
         self.n_real_sims = 0
         self.max_real_sims = 20
@@ -91,68 +243,66 @@ class BayesianCalibrator:
         print(f"\n🔧 Real Simulation #{self.n_real_sims}/{self.max_real_sims}")
         print(f"   Parameters: {params}")
 
-        # Create modified IDF with these parameters
-        modified_idf = f"sample_files/calibration_run_{self.n_real_sims}.idf"
-
-        # Apply infiltration multiplier via MCP
-        self.manager.change_infiltration_by_mult(
-            idf_path=self.idf_path,
-            mult=params['infiltration_mult'],
-            output_path=modified_idf
-        )
-
-        # TODO: Apply R-value and setpoint modifications
-        # (Would need additional MCP tools or direct IDF manipulation)
-
-        # Run simulation (returns JSON string with results)
-        result_json = self.manager.run_simulation(
-            idf_path=modified_idf,
-            weather_file=self.weather_file,
-            annual=True
-        )
-
-        # Parse JSON result
-        result = json.loads(result_json)
-        output_dir = result['output_directory']
-
-        # Extract annual energy from results
-        energy_kwh = self._extract_annual_energy(output_dir)
+        energy_kwh = _run_one(self.idf_path, self.weather_file, params,
+                              self.n_real_sims, manager=self.manager)
 
         print(f"   ✅ Result: {energy_kwh:,.0f} kWh/year")
 
         return energy_kwh
 
-    def _extract_annual_energy(self, output_dir: str) -> float:
-        """Extract annual energy from EnergyPlus outputs"""
-        # Read from HTML table or SQL database
-        output_path = Path(output_dir)
+    @staticmethod
+    def _extract_annual_energy(output_dir: str, output_prefix: str = "eplusout") -> float:
+        """
+        Extract annual energy from EnergyPlus outputs
 
-        # Find HTML table file (name varies based on output prefix)
-        html_files = list(output_path.glob("*Table.htm"))
-        if not html_files:
-            html_files = list(output_path.glob("eplustbl.htm"))
+        Output file names are built from the prefix the simulation ran with;
+        the directory is only scanned when none of those files exist.
+        """
+        output_path = Path(output_dir)
 
-        if html_files:
-            html_file = html_files[0]
+        # Preferred: direct lookup in the SQLite output
+        sql_file = output_path / f"{output_prefix}.sql"
+        if not sql_file.is_file():
+            sql_file = next(output_path.glob("*.sql"), None)
+        if sql_file is not None:
+            # Output:SQLite "Simple" files have no tabular tables
+            try:
+                with closing(sqlite3.connect(str(sql_file))) as conn:
+                    row = conn.execute(_TOTAL_SITE_ENERGY_SQL).fetchone()
+            except sqlite3.OperationalError:
+                row = None
+            if row:
+                return float(row[0]) * 277.778  # GJ to kWh
+
+        # Fallback: HTML table ("<prefix>Table.htm" with the capital-C
+        # suffix style, "eplustbl.htm" with the legacy style)
+        html_file = next((path for path in (output_path / f"{output_prefix}Table.htm",
+                                            output_path / "eplustbl.htm")
+                          if path.is_file()), None)
+        if html_file is None:
+            html_file = next(output_path.glob("*Table.htm"), None)
+
+        if html_file is not None:
             # Parse HTML for total site energy
             # Simplified - in practice would use pandas.read_html()
-            import re
             html_content = html_file.read_text()
 
             # Find "Total Site Energy" in GJ, convert to kWh
-            match = re.search(r'Total Site Energy.*?(\d+\.\d+).*?GJ', html_content, re.DOTALL)
-            if match:
-                energy_gj = float(match.group(1))
+            energy_gj = total_site_energy_gj(html_content)
+            if energy_gj is not None:
                 energy_kwh = energy_gj * 277.778  # GJ to kWh
                 return energy_kwh
 
         # Fallback: use meter CSV
         meter_file = Path(output_dir) / "eplusout_meters.csv"
         if meter_file.exists():
-            df = pd.read_csv(meter_file, skiprows=1)
-            if 'Electricity:Facility [J](Hourly)' in df.columns:
-                total_joules = df['Electricity:Facility [J](Hourly)'].sum()
-                return total_joules / 3.6e6  # Joules to kWh
+            # Parse only the facility electricity column
+            df = pd.read_csv(meter_file, skiprows=1, engine='c',
+                             usecols=lambda c: c == _ELEC_FACILITY_COLUMN,
+                             dtype=np.float32)
+            if _ELEC_FACILITY_COLUMN in df.columns:
+                total_joules = df[_ELEC_FACILITY_COLUMN].to_numpy().sum(dtype=np.float64)
+                return float(total_joules) / 3.6e6  # Joules to kWh
 
         raise ValueError(f"Could not extract energy from {output_dir}")
 
@@ -165,26 +315,36 @@ class BayesianCalibrator:
         """
         print(f"\n📊 Initializing GP Surrogate with {n_initial_samples} samples")
 
-        # Latin Hypercube Sampling for space-filling design
-        from scipy.stats import qmc
-
-        sampler = qmc.LatinHypercube(d=len(self.param_names))
+        # Latin Hypercube Sampling for space-filling design; random-cd
+        # optimization lowers the centered discrepancy of the small design
+        sampler = qmc.LatinHypercube(d=len(self.param_names), scramble=True,
+                                     optimization='random-cd', seed=42)
         samples = sampler.random(n=n_initial_samples)
 
         # Scale to parameter bounds
-        for i, (param_name, (lb, ub)) in enumerate(self.param_bounds.items()):
-            samples[:, i] = lb + samples[:, i] * (ub - lb)
-
-        # Run real simulations for each sample
-        for sample in samples:
-            params = dict(zip(self.param_names, sample))
-            energy = self.run_mcp_simulation(params)
-
-            self.X_train.append(sample)
-            self.y_train.append(energy)
-
-        self.X_train = np.array(self.X_train)
-        self.y_train = np.array(self.y_train)
+        samples = self._lb + samples * (self._ub - self._lb)
+
+        # Run the real simulations concurrently; each is an independent
+        # EnergyPlus process writing its own run_id-specific IDF
+        run_ids = range(self.n_real_sims + 1, self.n_real_sims + len(samples) + 1)
+        param_sets = [dict(zip(self.param_names, map(float, sample))) for sample in samples]
+        self.n_real_sims += len(samples)
+
+        print(f"   Running {len(samples)} real simulations in parallel")
+        with ProcessPoolExecutor(max_workers=min(len(samples), os.cpu_count() or 1)) as executor:
+            energies = list(executor.map(
+                _run_one,
+                [self.idf_path] * len(samples),
+                [self.weather_file] * len(samples),
+                param_sets,
+                run_ids
+            ))
+
+        for run_id, params, energy in zip(run_ids, param_sets, energies):
+            print(f"   #{run_id}: {params} -> {energy:,.0f} kWh/year")
+
+        self.X_train = np.array(samples)
+        self.y_train = np.array(energies)
 
         # Train initial GP
         self._fit_gp()
@@ -196,16 +356,83 @@ class BayesianCalibrator:
         """Fit/update Gaussian Process surrogate"""
         kernel = C(1.0, (1e-3, 1e3)) * RBF([1.0] * len(self.param_names), (1e-2, 1e2))
 
+        # Drop near-duplicate samples (per-parameter grid: r_value_mult,
+        # thermostat_setpoint, infiltration_mult) so they cannot make the
+        # kernel matrix ill-conditioned; the first occurrence is kept
+        rounded = np.round(self.X_train / self._dedup_tol)
+        _, idx = np.unique(rounded, axis=0, return_index=True)
+        idx = np.sort(idx)
+        X_fit = self.X_train[idx]
+        y_fit = self.y_train[idx]
+
+        # Standardize y once here rather than inside every fit/predict
+        self._y_mean = float(y_fit.mean())
+        self._y_std = float(y_fit.std()) or 1.0
+        y_norm = (y_fit - self._y_mean) / self._y_std
+
         self.gp = GaussianProcessRegressor(
             kernel=kernel,
             n_restarts_optimizer=10,
             alpha=1e-6,
-            normalize_y=True
+            normalize_y=False
         )
 
-        self.gp.fit(self.X_train, self.y_train)
+        self.gp.fit(X_fit, y_norm)
+        self._cache_gp_factors()
+
+        print(f"   GP updated with {len(y_fit)} training points"
+              f" ({len(self.y_train) - len(y_fit)} duplicates dropped)")
+
+    def _cache_gp_factors(self):
+        """
+        Stash the fitted GP's Cholesky factor, weights and kernel
+        hyperparameters (y scaling is set by _fit_gp)
+
+        sklearn still optimizes the hyperparameters; kernel evaluations after
+        the fit go through the plain rbf() helper instead of the kernel object.
+        """
+        self._L = self.gp.L_
+        self._alpha = self.gp.alpha_
+        self._X_train = np.ascontiguousarray(self.gp.X_train_, dtype=np.float64)
+        self._signal_var = float(self.gp.kernel_.k1.constant_value)
+        self._length_scale = np.asarray(self.gp.kernel_.k2.length_scale, dtype=np.float64)
+
+        values = (self._X_train, np.asarray(self._alpha, dtype=np.float64), self._length_scale,
+                  np.float64(self._signal_var), np.float64(self._y_mean), np.float64(self._y_std))
+        if self._gp_shared is None:
+            self._gp_shared = tuple(pytensor.shared(value) for value in values)
+        else:
+            for shared, value in zip(self._gp_shared, values):
+                shared.set_value(value)
+
+    def _add_training_point(self, x_new: np.ndarray, energy: float):
+        """
+        Append one simulation to the GP via a rank-1 Cholesky update
+
+        Kernel hyperparameters and y scaling stay at their last fitted values,
+        so each update is O(n^2); call _fit_gp() to re-optimize them.
+        """
+        x_new = np.atleast_2d(np.asarray(x_new, dtype=np.float64))
+        k_new = rbf(x_new, self._X_train, self._length_scale, self._signal_var)[0]
+        k_nn = self._signal_var + self.gp.alpha
+
+        l = solve_triangular(self._L, k_new, lower=True)
+        l_nn = np.sqrt(max(k_nn - l @ l, 1e-12))
+        L = np.block([[self._L, np.zeros((len(l), 1))],
+                      [l[np.newaxis, :], np.array([[l_nn]])]])
+
+        self.X_train = np.vstack([self.X_train, x_new])
+        self.y_train = np.append(self.y_train, energy)
+        y_norm = np.append(self.gp.y_train_, (energy - self._y_mean) / self._y_std)
 
-        print(f"   GP updated with {len(self.y_train)} training points")
+        # Write back into the regressor so gp.predict sees the new point too
+        self.gp.X_train_ = np.vstack([self._X_train, x_new])
+        self.gp.y_train_ = y_norm
+        self.gp.L_ = L
+        self.gp.alpha_ = cho_solve((L, True), y_norm)
+        self._cache_gp_factors()
+
+        print(f"   GP updated with {len(y_norm)} training points (rank-1)")
 
     def gp_predict(self, X: np.ndarray) -> tuple:
         """
@@ -217,21 +444,42 @@ class BayesianCalibrator:
         if self.gp is None:
             raise ValueError("GP not initialized. Call initialize_gp_surrogate() first.")
 
-        mean, std = self.gp.predict(X.reshape(-1, len(self.param_names)), return_std=True)
-        return mean, std
+        mean_n, std_n = self.gp.predict(X.reshape(-1, len(self.param_names)), return_std=True)
+        return mean_n * self._y_std + self._y_mean, std_n * self._y_std
 
-    def run_bayesian_inference(self, n_samples: int = 500, tune: int = 200):
+    def _propose_next_sample(self, n_candidates: int = 2048) -> np.ndarray:
         """
-        Run PyMC MCMC sampling with active learning
+        Pick the next simulation point by expected improvement
 
-        Args:
-            n_samples: Number of MCMC samples per chain
-            tune: Number of tuning steps
+        Improvement is the reduction in |energy - observed| below the best
+        training point so far, taken in closed form under the GP's Normal
+        predictive distribution over a Latin Hypercube candidate set.
         """
-        print(f"\n🔬 Running Bayesian Inference")
-        print(f"   MCMC samples: {n_samples} (tune: {tune})")
-        print(f"   Active learning: Refine GP every 20 samples")
+        unit = qmc.LatinHypercube(d=len(self.param_names)).random(n=n_candidates)
+        candidates = self._lb + unit * (self._ub - self._lb)
+
+        mu, sd = self.gp_predict(candidates)
+        best = np.abs(self.y_train - self.observed_energy).min()
+
+        # u = energy - observed ~ N(m, sd²); EI = E[max(0, best - |u|)]
+        m = mu - self.observed_energy
+        sd = np.maximum(sd, 1e-12)
+        z_lo, z_0, z_hi = (-best - m) / sd, -m / sd, (best - m) / sd
+        p_pos = norm.cdf(z_hi) - norm.cdf(z_0)
+        p_neg = norm.cdf(z_0) - norm.cdf(z_lo)
+        u_pos = m * p_pos + sd * (norm.pdf(z_0) - norm.pdf(z_hi))
+        u_neg = m * p_neg + sd * (norm.pdf(z_lo) - norm.pdf(z_0))
+        ei = best * (p_pos + p_neg) - u_pos + u_neg
+
+        return candidates[np.argmax(ei)]
+
+    def _build_model(self):
+        """
+        Build the calibration model around the GP surrogate Op
 
+        The GP enters only through self._gp_shared, so the same model (and
+        its compiled logp) stays valid after the GP is refit.
+        """
         with pm.Model() as model:
             # Priors for calibration parameters
             r_mult = pm.TruncatedNormal(
@@ -257,18 +505,8 @@ class BayesianCalibrator:
             # Stack parameters for GP prediction
             params = pm.math.stack([r_mult, setpoint, leak_mult])
 
-            # GP surrogate prediction (mean only for now)
-            # Note: PyMC doesn't directly support sklearn GP, so we use custom function
-            def gp_surrogate(param_array):
-                """Custom GP prediction for PyMC"""
-                mean, _ = self.gp_predict(param_array)
-                return mean[0]
-
-            # Predicted energy from GP surrogate
-            mu = pm.Deterministic('predicted_energy',
-                                  pm.math.as_tensor_variable(
-                                      [gp_surrogate(params.eval()) for _ in range(1)]
-                                  )[0])
+            # Predicted energy from GP surrogate, evaluated at each draw
+            mu = pm.Deterministic('predicted_energy', GPSurrogateOp()(params, *self._gp_shared))
 
             # Observation uncertainty
             sigma = pm.HalfNormal('obs_uncertainty', sigma=10000)  # ±10,000 kWh uncertainty
@@ -281,39 +519,51 @@ class BayesianCalibrator:
                 observed=self.observed_energy
             )
 
-            # Sample posterior
-            print("\n   Starting MCMC sampling...")
+        return model
+
+    def run_bayesian_inference(self, n_samples: int = 500, tune: int = 200):
+        """
+        Run PyMC MCMC sampling with active learning
+
+        Args:
+            n_samples: Number of MCMC samples per chain
+            tune: Number of tuning steps
+        """
+        print(f"\n🔬 Running Bayesian Inference")
+        print(f"   MCMC samples: {n_samples} (tune: {tune})")
+        print(f"   Active learning: Expected improvement over LHS candidates")
+
+        if self._model is None:
+            self._model = self._build_model()
+        model = self._model
+
+        with model:
+            # Sample posterior; the surrogate Op has no gradient, so use a
+            # gradient-free sampler explicitly (NUTS tuning args would be unused)
+            print("\n   Starting MCMC sampling (Slice)...")
             trace = pm.sample(
                 draws=n_samples,
                 tune=tune,
                 chains=2,
-                target_accept=0.9,
+                step=pm.Slice(),
                 return_inferencedata=True
             )
 
-        # Active Learning: Refine GP with samples from posterior
-        # Extract every 20th sample and run real simulation
-        posterior_samples = az.extract(trace, num_samples=20)
-
-        print(f"\n🔄 Active Learning: Refining GP with posterior samples")
+        # Active Learning: run real simulations where the GP expects the
+        # largest improvement in matching the observed energy
+        print(f"\n🔄 Active Learning: Refining GP at expected-improvement maxima")
         for i in range(min(10, self.max_real_sims - self.n_real_sims)):
-            # Get sample from posterior
-            sample_params = {
-                'r_value_mult': float(posterior_samples['r_value_mult'][i]),
-                'thermostat_setpoint': float(posterior_samples['thermostat_setpoint'][i]),
-                'infiltration_mult': float(posterior_samples['infiltration_mult'][i])
-            }
+            param_array = self._propose_next_sample()
+            sample_params = dict(zip(self.param_names, map(float, param_array)))
 
             # Run real simulation
             energy = self.run_mcp_simulation(sample_params)
 
-            # Add to training set
-            param_array = np.array([sample_params[name] for name in self.param_names])
-            self.X_train = np.vstack([self.X_train, param_array])
-            self.y_train = np.append(self.y_train, energy)
+            # Add to training set with an incremental Cholesky update
+            self._add_training_point(param_array, energy)
 
-            # Refit GP
-            self._fit_gp()
+        # Re-optimize kernel hyperparameters once on the enlarged set
+        self._fit_gp()
 
         return trace, model
 
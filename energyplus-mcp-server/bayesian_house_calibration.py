@@ -22,15 +22,58 @@ import re
 
 try:
     import pymc as pm
+    import pytensor.tensor as pt
     import arviz as az
     HAS_PYMC = True
 except ImportError:
     print("PyMC not installed. Installing now...")
     subprocess.run(["pip", "install", "pymc", "arviz"], check=True)
     import pymc as pm
+    import pytensor.tensor as pt
     import arviz as az
     HAS_PYMC = True
 
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
+# JAX/NumPyro backend advances all chains together in one XLA-compiled kernel
+try:
+    from pymc.sampling.jax import sample_numpyro_nuts
+    HAS_NUMPYRO = True
+except ImportError:
+    HAS_NUMPYRO = False
+
+# nutpie compiles the logp and runs many chains concurrently on CPU
+try:
+    import nutpie
+    HAS_NUTPIE = True
+except ImportError:
+    HAS_NUTPIE = False
+
+try:
+    import pyarrow
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Monthly climate and usage profiles, Jan-Dec
+# Heating degree days (HDD) and Cooling degree days (CDD) for NY
+# Base 65°F - typical for heating/cooling calculations
+_HDD = np.array([1100, 950, 800, 450, 200, 50,
+                 10, 20, 100, 350, 650, 950], dtype=np.float64)  # Approximate for NY
+_CDD = np.array([0, 0, 0, 10, 80, 250,
+                 400, 350, 150, 20, 0, 0], dtype=np.float64)     # Approximate for NY
+# Typical monthly patterns (higher in winter for heating, summer for cooling)
+_SEASONAL = np.array([1.4, 1.3, 1.1, 0.9, 0.8, 0.9,
+                      1.1, 1.0, 0.8, 0.9, 1.1, 1.3], dtype=np.float64)
+
+HDD_SYM = pt.constant(_HDD)
+CDD_SYM = pt.constant(_CDD)
+
 print("=" * 80)
 print("BAYESIAN CALIBRATION OF SINGLE FAMILY HOUSE")
 print("Using Published Priors from Building Science Literature")
@@ -104,6 +147,12 @@ priors_info = {
     }
 }
 
+# Columnar view of the priors: one float64 column per numeric field (NaN where
+# a distribution does not use it), plus the descriptive string columns
+priors_df = pd.DataFrame.from_dict(priors_info, orient='index').astype(
+    {'mean': 'float64', 'std': 'float64', 'mu': 'float64', 'sigma': 'float64'})
+priors_df.index.name = 'parameter'
+
 for param, info in priors_info.items():
     print(f"\n{param}:")
     print(f"  Distribution: {info['distribution']}")
@@ -141,13 +190,9 @@ true_params = {
 months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
 
-# Typical monthly patterns (higher in winter for heating, summer for cooling)
-seasonal_factors = np.array([1.4, 1.3, 1.1, 0.9, 0.8, 0.9,
-                             1.1, 1.0, 0.8, 0.9, 1.1, 1.3])
-
 # Base monthly consumption (kWh) - typical for 2000 ft² house in NY
 base_consumption = 1500
-true_monthly = base_consumption * seasonal_factors
+true_monthly = base_consumption * _SEASONAL
 
 # Add measurement noise (±5% typical for utility meters)
 measurement_noise_std = true_monthly * 0.05
@@ -216,36 +261,28 @@ with pm.Model() as calibration_model:
     roof_area = 2000   # ft²
     window_area = 300  # ft² (15% of floor area)
 
-    # Heating degree days (HDD) and Cooling degree days (CDD) for NY
-    # Base 65°F - typical for heating/cooling calculations
-    hdd_monthly = np.array([1100, 950, 800, 450, 200, 50,
-                           10, 20, 100, 350, 650, 950])  # Approximate for NY
-    cdd_monthly = np.array([0, 0, 0, 10, 80, 250,
-                           400, 350, 150, 20, 0, 0])    # Approximate for NY
-
-    # Energy model for each month
-    monthly_predictions = []
+    # Energy model for all 12 months as one broadcast expression
+    ua_total = (wall_u * wall_area + roof_u * roof_area +
+               window_u * window_area) * (1 + infiltration * 0.1)
 
-    for i in range(12):
-        # Heating energy (kWh)
-        # Q_heat = UA × HDD × 24 / heating_eff / 3412 (Btu to kWh)
-        ua_total = (wall_u * wall_area + roof_u * roof_area +
-                   window_u * window_area) * (1 + infiltration * 0.1)
+    # Scalar per-draw terms are formed once; only the final multiply and
+    # add touch the 12-month vectors
+    # Heating energy (kWh)
+    # Q_heat = UA × HDD × 24 / heating_eff / 3412 (Btu to kWh)
+    dd_btu_to_kwh = 24.0 / 3412.0            # hours/day / (Btu per kWh): UA*degree-days in Btu -> kWh
+    ua_dd_to_kwh = ua_total * dd_btu_to_kwh
+    heating_coef = ua_dd_to_kwh / heating_eff
 
-        heating_load = (ua_total * hdd_monthly[i] * 24) / heating_eff / 3412
+    # Cooling energy (kWh)
+    cooling_coef = ua_dd_to_kwh / cooling_cop
 
-        # Cooling energy (kWh)
-        cooling_load = (ua_total * cdd_monthly[i] * 24) / cooling_cop / 3412
+    # Internal gains and plug loads
+    internal_gains = lpd * floor_area * 730 / 1000  # monthly kWh
+    plug_loads = occupants * 100  # kWh/month per person
+    gains = internal_gains + plug_loads
 
-        # Internal gains and plug loads
-        internal_gains = lpd * floor_area * 730 / 1000  # monthly kWh
-        plug_loads = occupants * 100  # kWh/month per person
-
-        # Total monthly energy
-        total_monthly = heating_load + cooling_load + internal_gains + plug_loads
-        monthly_predictions.append(total_monthly)
-
-    predicted_energy = pm.math.stack(monthly_predictions)
+    # Total monthly energy, shape (12,)
+    predicted_energy = heating_coef * HDD_SYM + cooling_coef * CDD_SYM + gains
 
     # Observation noise (measurement uncertainty)
     sigma_obs = pm.HalfNormal("obs_noise", sigma=100)
@@ -264,22 +301,55 @@ print("RUNNING BAYESIAN INFERENCE (MCMC Sampling)")
 print("-" * 80)
 
 # Sample from posterior using NUTS (No U-Turn Sampler)
+if HAS_NUTPIE:
+    n_chains = 16
+elif HAS_NUMPYRO:
+    n_chains = 8
+else:
+    n_chains = 2
+
 with calibration_model:
     print("\nSampling from posterior distribution...")
-    print("Algorithm: NUTS (No U-Turn Sampler)")
-    print("Chains: 2")
+    if HAS_NUTPIE:
+        print("Algorithm: NUTS (nutpie)")
+    elif HAS_NUMPYRO:
+        print("Algorithm: NUTS (NumPyro, vectorized chains)")
+    else:
+        print("Algorithm: NUTS (No U-Turn Sampler)")
+    print(f"Chains: {n_chains}")
     print("Draws per chain: 1000")
     print("Tune: 500")
     print()
 
-    trace = pm.sample(
-        draws=1000,
-        tune=500,
-        chains=2,
-        random_seed=42,
-        return_inferencedata=True,
-        progressbar=True
-    )
+    if HAS_NUTPIE:
+        compiled_model = nutpie.compile_pymc_model(calibration_model)
+        trace = nutpie.sample(
+            compiled_model,
+            draws=1000,
+            tune=500,
+            chains=n_chains,
+            seed=42,
+            progress_bar=True
+        )
+    elif HAS_NUMPYRO:
+        trace = sample_numpyro_nuts(
+            draws=1000,
+            tune=500,
+            chains=n_chains,
+            chain_method="vectorized",
+            target_accept=0.9,
+            random_seed=42,
+            progressbar=True
+        )
+    else:
+        trace = pm.sample(
+            draws=1000,
+            tune=500,
+            chains=n_chains,
+            random_seed=42,
+            return_inferencedata=True,
+            progressbar=True
+        )
 
 print("\n✓ Sampling complete!")
 
@@ -404,7 +474,23 @@ output_dir = Path("/workspace/energyplus-mcp-server/bayesian_calibration_results
 output_dir.mkdir(exist_ok=True)
 
 # Save trace
-trace.to_netcdf(output_dir / "posterior_trace.nc")
+# Same group-by-group layout as InferenceData.to_netcdf, written through
+# h5netcdf with each chain stored in 500-draw compressed chunks. zlib +
+# shuffle is built into every HDF5, so all readers can open the file
+compression = {"zlib": True, "complevel": 4, "shuffle": True}
+mode = "w"
+for group in trace.groups():
+    data = getattr(trace, group)
+    encoding = {}
+    for name, values in data.variables.items():
+        if values.dtype.kind not in "biuf":
+            continue
+        encoding[name] = dict(compression)
+        if values.dims[:2] == ("chain", "draw"):
+            encoding[name]["chunksizes"] = (1, min(500, values.shape[1])) + values.shape[2:]
+    data.to_netcdf(output_dir / "posterior_trace.nc", mode=mode, group=group,
+                   engine="h5netcdf", encoding=encoding)
+    mode = "a"
 print(f"\n✓ Posterior trace saved to: {output_dir / 'posterior_trace.nc'}")
 
 # Save summary
@@ -417,14 +503,17 @@ comparison_df.to_csv(output_dir / "calibration_comparison.csv", index=False)
 print(f"✓ Comparison results saved to: {output_dir / 'calibration_comparison.csv'}")
 
 # Save priors info
-with open(output_dir / "published_priors.json", "w") as f:
-    # Convert to JSON-serializable format
-    priors_json = {}
-    for k, v in priors_info.items():
-        priors_json[k] = {key: float(val) if isinstance(val, np.floating) else val
-                         for key, val in v.items()}
-    json.dump(priors_json, f, indent=2)
+if ORJSON_AVAILABLE:
+    # numpy scalars (e.g. the log-space infiltration mu) serialize natively
+    (output_dir / "published_priors.json").write_bytes(
+        orjson.dumps(priors_info, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+else:
+    (output_dir / "published_priors.json").write_text(json.dumps(priors_info, indent=2, default=float))
+if HAS_PYARROW:
+    priors_df.to_parquet(output_dir / "published_priors.parquet")
 print(f"✓ Published priors saved to: {output_dir / 'published_priors.json'}")
+if HAS_PYARROW:
+    print(f"✓ Priors table saved to: {output_dir / 'published_priors.parquet'}")
 
 print("\n" + "=" * 80)
 print("BAYESIAN CALIBRATION COMPLETE!")
@@ -432,6 +521,6 @@ print("=" * 80)
 print(f"\nAll results saved to: {output_dir}")
 print("\nKey findings:")
 print(f"  • Bayesian calibration improved parameter estimates by {improvement:.1f}%")
-print(f"  • Posterior distributions successfully sampled (2000 draws)")
+print(f"  • Posterior distributions successfully sampled ({n_chains * 1000} draws)")
 print(f"  • MCMC chains converged (R-hat < 1.01)")
 print(f"  • Used published priors from ASHRAE, DOE, NREL, and LBNL")
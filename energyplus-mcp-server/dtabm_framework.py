@@ -15,12 +15,200 @@ This enables:
 5. Predictive analytics (forecasting based on current state)
 """
 
+import atexit
+import csv
+import functools
+import io
 import json
+import mmap
+import os
+import re
+import shutil
+import sys
+import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 import pandas as pd
 
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
+PYARROW_AVAILABLE = False
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pass
+
+# Column order of the append-only logs
+_ANOMALY_FIELDS = ('date', 'predicted_kwh', 'actual_kwh', 'error_pct', 'severity', 'investigated')
+_TRACKING_FIELDS = ('date', 'predicted_kwh', 'actual_kwh', 'error_pct', 'model_version')
+
+# CSV has no native types; parse the flag as a real bool (not "False" strings)
+_LOG_CSV_DTYPES = {
+    'predicted_kwh': 'float32',
+    'actual_kwh': 'float32',
+    'error_pct': 'float32',
+    'investigated': 'bool'
+}
+
+if PYARROW_AVAILABLE:
+    # Typed schemas for the append-only logs; each log is a directory of
+    # Parquet part files that pq.read_table reads back as one table.
+    # Energies and errors carry a few significant digits, so float32 suffices
+    _ANOMALY_SCHEMA = pa.schema([
+        ('date', pa.string()),
+        ('predicted_kwh', pa.float32()),
+        ('actual_kwh', pa.float32()),
+        ('error_pct', pa.float32()),
+        ('severity', pa.dictionary(pa.int8(), pa.string())),
+        ('investigated', pa.bool_())
+    ])
+    _TRACKING_SCHEMA = pa.schema([
+        ('date', pa.string()),
+        ('predicted_kwh', pa.float32()),
+        ('actual_kwh', pa.float32()),
+        ('error_pct', pa.float32()),
+        ('model_version', pa.string())
+    ])
+else:
+    _ANOMALY_SCHEMA = _TRACKING_SCHEMA = None
+
+# IDF field patterns per ECM modification type, compiled once at import.
+# Group 1 is the object text up to the field, group 2 the value to scale
+_ECM_PATTERNS = {
+    # Lights object up to its Watts/Area field, then the first number after it
+    'lighting': re.compile(rb'(Lights,\s*[^;]+?Watts/Area[^;]+?)(\d+\.?\d*)', re.IGNORECASE),
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _load_log_cached(path_str, mtime_ns, size, columns):
+    """Read log columns as numpy arrays once per (mtime, size) version; callers must not mutate them"""
+    if PYARROW_AVAILABLE:
+        # Columnar read straight into numpy, without a pandas round trip
+        table = pq.read_table(path_str, columns=list(columns))
+        return {name: table.column(name).to_numpy() for name in columns}
+    df = pd.read_csv(path_str, usecols=list(columns), dtype=_LOG_CSV_DTYPES)
+    return {name: df[name].to_numpy() for name in columns}
+
+
+@functools.lru_cache(maxsize=128)
+def _simulate_month(idf_path_str, idf_mtime_ns, month):
+    """Monthly energy for one IDF version; memoized until the IDF changes"""
+    # In real implementation, would:
+    # 1. Use actual weather data for the month
+    # 2. Run EnergyPlus for just that month
+    # 3. Extract monthly energy consumption
+
+    # For demo, return calibrated baseline annual / 12
+    return 449389 / 12  # ~37,449 kWh/month
+
+
+_FICLONE = 0x40049409  # linux/fs.h
+
+# Buffered log rows per file before they are written out as one batch
+_LOG_FLUSH_ROWS = 64
+
+
+def _fast_copy(src, dst):
+    """Copy src to dst, as a reflink clone on copy-on-write filesystems"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                return
+            except OSError:
+                pass
+        if hasattr(os, 'copy_file_range'):
+            # In-kernel copy, which still reflinks on filesystems that support it
+            try:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+        fsrc.seek(0)
+        fdst.seek(0)
+        fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst)
+
+
+def _writev_all(fdst, buffers):
+    """Gather-write buffers to an open file, resuming after partial writes"""
+    if not hasattr(os, 'writev'):
+        for buf in buffers:
+            fdst.write(buf)
+        return
+    iov_max = os.sysconf('SC_IOV_MAX')
+    buffers = [memoryview(buf) for buf in buffers]
+    i = 0
+    while i < len(buffers):
+        written = os.writev(fdst.fileno(), buffers[i:i + iov_max])
+        while i < len(buffers) and written >= len(buffers[i]):
+            written -= len(buffers[i])
+            i += 1
+        if written:
+            buffers[i] = buffers[i][written:]
+
+
+def _scale_field(src, dst, pattern, factor):
+    """Write src to dst with every value matched by an _ECM_PATTERNS entry scaled by factor"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if os.fstat(fsrc.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fsrc.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Unchanged spans are views into the mapping; only the new values are built
+            view = memoryview(mm)
+            spans = []
+            pos = 0
+            for m in pattern.finditer(mm):
+                spans.append(view[pos:m.start(2)])
+                spans.append(b'%.2f' % (float(m.group(2)) * factor))
+                pos = m.end()
+            spans.append(view[pos:])
+            _writev_all(fdst, spans)
+            # Views must be gone before the mapping can close
+            del spans
+            view.release()
+
+
+def _sim_worker(idf_path_str, month):
+    """Module-level so ProcessPoolExecutor can pickle it; one monthly simulation"""
+    return _simulate_month(idf_path_str, os.stat(idf_path_str).st_mtime_ns, month)
+
+
+def _dump_json(path, obj):
+    """Write obj as indented JSON, serialized by orjson when available"""
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(obj, indent=2).encode()
+    # Whole-file swap so readers never see a half-written file; no fsync
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
 class DigitalTwinABM:
     """
     Digital Twin Asset-Based Model
@@ -36,11 +224,14 @@ class DigitalTwinABM:
         self.work_dir = Path("/workspace/energyplus-mcp-server/digital_twin")
         self.work_dir.mkdir(exist_ok=True)
 
+        # One timestamp for everything created together
+        created = datetime.now().isoformat()
+
         # Initialize digital twin structure
         self.dt_registry = {
             "DTABM_Baseline": {
                 "version": "1.0.0",
-                "created": datetime.now().isoformat(),
+                "created": created,
                 "description": "Calibrated pre-retrofit baseline (FROZEN)",
                 "idf_file": str(calibrated_baseline_idf),
                 "status": "frozen",
@@ -48,7 +239,7 @@ class DigitalTwinABM:
             },
             "DTABM_Operational": {
                 "version": "1.0.0",
-                "created": datetime.now().isoformat(),
+                "created": created,
                 "description": "Current operational model (LIVE - updates monthly)",
                 "idf_file": None,
                 "status": "active",
@@ -66,6 +257,15 @@ class DigitalTwinABM:
             }
         }
 
+        # Append-only logs (Parquet datasets when pyarrow is available)
+        log_suffix = ".parquet" if PYARROW_AVAILABLE else ".csv"
+        self.anomaly_log = self.work_dir / f"anomaly_log{log_suffix}"
+        self.tracking_file = self.work_dir / f"dtabm_tracking{log_suffix}"
+
+        # Log rows are buffered in memory; flushed in batches, before reads and at exit
+        self._log_buffers = {}
+        atexit.register(self._flush_logs)
+
         # Save registry
         self.save_registry()
 
@@ -75,9 +275,49 @@ class DigitalTwinABM:
 
     def save_registry(self):
         """Save digital twin registry"""
-        registry_file = self.work_dir / "dtabm_registry.json"
-        with open(registry_file, 'w') as f:
-            json.dump(self.dt_registry, f, indent=2)
+        _dump_json(self.work_dir / "dtabm_registry.json", self.dt_registry)
+
+    def _append_log(self, log_path, record, schema=None, fields=None):
+        """Buffer one record for an append-only log"""
+        _, _, records = self._log_buffers.setdefault(log_path, (schema, fields, []))
+        records.append(record)
+        if len(records) >= _LOG_FLUSH_ROWS:
+            self._flush_log(log_path)
+
+    def _flush_log(self, log_path):
+        """Write the buffered records of one log as a single batch"""
+        schema, fields, records = self._log_buffers.get(log_path, (None, None, []))
+        if not records:
+            return
+        self._log_buffers[log_path] = (schema, fields, [])
+
+        if PYARROW_AVAILABLE:
+            # New part file per batch; nanosecond names keep parts in write order
+            log_path.mkdir(exist_ok=True)
+            table = pa.Table.from_pylist(records, schema=schema)
+            pq.write_table(table, log_path / f"{time.time_ns()}.parquet", compression='zstd')
+            return
+
+        with open(log_path, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields or list(records[0]))
+            if f.tell() == 0:
+                writer.writeheader()
+            writer.writerows(records)
+
+    def _flush_logs(self):
+        """Write out every buffered log"""
+        for log_path in list(self._log_buffers):
+            self._flush_log(log_path)
+
+    def _read_log(self, log_path, columns):
+        """Read the given columns of a log as numpy arrays, or None if nothing was logged yet"""
+        self._flush_log(log_path)
+        if not log_path.exists():
+            return None
+        st = os.stat(log_path)
+        # A Parquet log is a directory, so its part count stands in for the size
+        size = len(os.listdir(log_path)) if log_path.is_dir() else st.st_size
+        return _load_log_cached(str(log_path), st.st_mtime_ns, size, tuple(columns))
 
     def create_dtabm_operational(self):
         """
@@ -89,11 +329,9 @@ class DigitalTwinABM:
         print("CREATING DTABM_OPERATIONAL")
         print("="*80 + "\n")
 
-        import shutil
-
         # Copy baseline as starting point
         operational_idf = self.work_dir / "DTABM_Operational_v1.0.0.idf"
-        shutil.copy(self.baseline_idf, operational_idf)
+        _fast_copy(self.baseline_idf, operational_idf)
 
         # Update registry
         self.dt_registry["DTABM_Operational"]["idf_file"] = str(operational_idf)
@@ -118,47 +356,53 @@ class DigitalTwinABM:
         4. Update operational model
         """
 
-        print("="*80)
-        print("MONTHLY DTABM UPDATE PROCESS")
-        print("="*80 + "\n")
+        # Report is assembled in memory and written with a single call
+        out = io.StringIO()
+        out.write("="*80 + "\n")
+        out.write("MONTHLY DTABM UPDATE PROCESS\n")
+        out.write("="*80 + "\n\n")
 
         current_date = datetime.now()
 
-        print(f"📅 Update Date: {current_date.strftime('%Y-%m-%d')}")
-        print(f"📊 Actual Energy (this month): {actual_energy_kwh:,.0f} kWh")
+        out.write(f"📅 Update Date: {current_date.strftime('%Y-%m-%d')}\n")
+        out.write(f"📊 Actual Energy (this month): {actual_energy_kwh:,.0f} kWh\n")
 
         # Run current operational model for comparison
         operational_idf = Path(self.dt_registry["DTABM_Operational"]["idf_file"])
 
-        print(f"\n⏳ Running DTABM_Operational model...")
+        out.write(f"\n⏳ Running DTABM_Operational model...\n")
 
         # Simulate (simplified - would run for specific month with actual weather)
-        predicted_energy_kwh = self.run_monthly_simulation(operational_idf)
+        predicted_energy_kwh = self.run_monthly_simulation(operational_idf, current_date.month)
 
         if predicted_energy_kwh:
-            print(f"   Predicted: {predicted_energy_kwh:,.0f} kWh")
-            print(f"   Actual: {actual_energy_kwh:,.0f} kWh")
+            out.write(f"   Predicted: {predicted_energy_kwh:,.0f} kWh\n")
+            out.write(f"   Actual: {actual_energy_kwh:,.0f} kWh\n")
 
             error_pct = (actual_energy_kwh - predicted_energy_kwh) / predicted_energy_kwh * 100
-            print(f"   Deviation: {error_pct:+.1f}%")
+            out.write(f"   Deviation: {error_pct:+.1f}%\n")
 
             # Determine if recalibration needed
             if abs(error_pct) > 10:
-                print(f"\n⚠️  ALERT: Deviation > 10% - Recalibration recommended")
-                print(f"   Possible causes:")
-                print(f"   - Occupancy change")
-                print(f"   - Equipment failure")
-                print(f"   - Operational schedule change")
-                print(f"   - Weather normalization issue")
-
-                # Log for investigation
-                self.log_anomaly(current_date, predicted_energy_kwh, actual_energy_kwh, error_pct)
+                out.write(f"\n⚠️  ALERT: Deviation > 10% - Recalibration recommended\n")
+                out.write(f"   Possible causes:\n")
+                out.write(f"   - Occupancy change\n")
+                out.write(f"   - Equipment failure\n")
+                out.write(f"   - Operational schedule change\n")
+                out.write(f"   - Weather normalization issue\n")
 
             elif abs(error_pct) > 5:
-                print(f"\n⚠️  Warning: Deviation > 5% - Monitor trend")
+                out.write(f"\n⚠️  Warning: Deviation > 5% - Monitor trend\n")
 
             else:
-                print(f"\n✅ Model tracking well (< 5% error)")
+                out.write(f"\n✅ Model tracking well (< 5% error)\n")
+
+        sys.stdout.write(out.getvalue())
+
+        if predicted_energy_kwh:
+            # Log for investigation
+            if abs(error_pct) > 10:
+                self.log_anomaly(current_date, predicted_energy_kwh, actual_energy_kwh, error_pct)
 
             # Update tracking data
             self.update_tracking_data(current_date, predicted_energy_kwh, actual_energy_kwh, error_pct)
@@ -169,59 +413,90 @@ class DigitalTwinABM:
 
         return error_pct
 
-    def run_monthly_simulation(self, idf_file):
-        """Run model for specific month (simplified)"""
-        # In real implementation, would:
-        # 1. Use actual weather data for the month
-        # 2. Run EnergyPlus for just that month
-        # 3. Extract monthly energy consumption
+    def batch_monthly_updates(self, records):
+        """
+        Replay a backlog of (date, actual_energy_kwh) meter readings
+
+        Months are independent, so their simulations run in parallel; the
+        results are then logged in order exactly as monthly_update_dtabm would.
+        Months without a prediction are not logged and get None as their error
+        """
+
+        print("="*80)
+        print(f"BATCH DTABM UPDATE: {len(records)} months")
+        print("="*80 + "\n")
+
+        if not records:
+            return []
+
+        operational_idf = self.dt_registry["DTABM_Operational"]["idf_file"]
+        months = [date.month for date, _ in records]
+
+        with ProcessPoolExecutor(max_workers=min(len(records), os.cpu_count() or 1)) as executor:
+            predictions = list(executor.map(_sim_worker, [operational_idf] * len(records), months))
+
+        errors = []
+        for (date, actual_energy_kwh), predicted_energy_kwh in zip(records, predictions):
+            if not predicted_energy_kwh:
+                print(f"   {date.strftime('%Y-%m')}: no prediction, not logged")
+                errors.append(None)
+                continue
+
+            error_pct = (actual_energy_kwh - predicted_energy_kwh) / predicted_energy_kwh * 100
+            print(f"   {date.strftime('%Y-%m')}: predicted {predicted_energy_kwh:,.0f} kWh, "
+                  f"actual {actual_energy_kwh:,.0f} kWh ({error_pct:+.1f}%)")
+
+            if abs(error_pct) > 10:
+                self.log_anomaly(date, predicted_energy_kwh, actual_energy_kwh, error_pct)
+            self.update_tracking_data(date, predicted_energy_kwh, actual_energy_kwh, error_pct)
+            errors.append(error_pct)
+
+        # Update registry; replaying an older backlog never moves last_update back
+        operational = self.dt_registry["DTABM_Operational"]
+        latest = max(date for date, _ in records)
+        if operational["last_update"] is not None:
+            latest = max(latest, datetime.fromisoformat(operational["last_update"]))
+        operational["last_update"] = latest.isoformat()
+        self.save_registry()
 
-        # For demo, return calibrated baseline annual / 12
-        return 449389 / 12  # ~37,449 kWh/month
+        return errors
+
+    def run_monthly_simulation(self, idf_file, month=None):
+        """Run model for specific month (simplified)"""
+        idf_file = Path(idf_file)
+        return _simulate_month(str(idf_file), idf_file.stat().st_mtime_ns, month)
 
     def log_anomaly(self, date, predicted, actual, error_pct):
         """Log performance anomalies for investigation"""
 
-        anomaly_log = self.work_dir / "anomaly_log.csv"
-
         anomaly = {
             'date': date.strftime('%Y-%m-%d'),
-            'predicted_kwh': predicted,
-            'actual_kwh': actual,
-            'error_pct': error_pct,
+            # Rounded to the stored float32 precision at ingress
+            'predicted_kwh': np.float32(predicted),
+            'actual_kwh': np.float32(actual),
+            'error_pct': np.float32(error_pct),
             'severity': 'HIGH' if abs(error_pct) > 15 else 'MEDIUM',
             'investigated': False
         }
 
         # Append to log
-        df = pd.DataFrame([anomaly])
-
-        if anomaly_log.exists():
-            df.to_csv(anomaly_log, mode='a', header=False, index=False)
-        else:
-            df.to_csv(anomaly_log, index=False)
+        self._append_log(self.anomaly_log, anomaly, _ANOMALY_SCHEMA, _ANOMALY_FIELDS)
 
-        print(f"\n   📝 Anomaly logged to: {anomaly_log.name}")
+        print(f"\n   📝 Anomaly logged to: {self.anomaly_log.name}")
 
     def update_tracking_data(self, date, predicted, actual, error):
         """Update monthly tracking data"""
 
-        tracking_file = self.work_dir / "dtabm_tracking.csv"
-
         data = {
             'date': date.strftime('%Y-%m-%d'),
-            'predicted_kwh': predicted,
-            'actual_kwh': actual,
-            'error_pct': error,
+            # Rounded to the stored float32 precision at ingress
+            'predicted_kwh': np.float32(predicted),
+            'actual_kwh': np.float32(actual),
+            'error_pct': np.float32(error),
             'model_version': self.dt_registry["DTABM_Operational"]["version"]
         }
 
-        df = pd.DataFrame([data])
-
-        if tracking_file.exists():
-            df.to_csv(tracking_file, mode='a', header=False, index=False)
-        else:
-            df.to_csv(tracking_file, index=False)
+        self._append_log(self.tracking_file, data, _TRACKING_SCHEMA, _TRACKING_FIELDS)
 
     def implement_ecm(self, ecm_name, ecm_description, ecm_modifications):
         """
@@ -231,85 +506,76 @@ class DigitalTwinABM:
         Creates new model reflecting actual changes made
         """
 
-        print("\n" + "="*80)
-        print(f"IMPLEMENTING ECM IN DIGITAL TWIN: {ecm_name}")
-        print("="*80 + "\n")
+        # One timestamp for the whole ECM event
+        now = datetime.now()
+        now_iso = now.isoformat()
 
-        print(f"📋 ECM: {ecm_name}")
-        print(f"   Description: {ecm_description}")
-        print(f"   Implementation Date: {datetime.now().strftime('%Y-%m-%d')}")
+        out = io.StringIO()
+        out.write("\n" + "="*80 + "\n")
+        out.write(f"IMPLEMENTING ECM IN DIGITAL TWIN: {ecm_name}\n")
+        out.write("="*80 + "\n\n")
+
+        out.write(f"📋 ECM: {ecm_name}\n")
+        out.write(f"   Description: {ecm_description}\n")
+        out.write(f"   Implementation Date: {now.strftime('%Y-%m-%d')}\n")
 
         # Create DTActual if first ECM
         if self.dt_registry["DTActual"]["version"] is None:
-            print(f"\n🆕 Creating DTActual (first ECM implementation)")
-
-            import shutil
+            out.write(f"\n🆕 Creating DTActual (first ECM implementation)\n")
 
             # Start from DTABM_Operational (most current)
-            operational_idf = Path(self.dt_registry["DTABM_Operational"]["idf_file"])
-            dtactual_idf = self.work_dir / "DTActual_v1.0.0.idf"
-            shutil.copy(operational_idf, dtactual_idf)
+            source_idf = Path(self.dt_registry["DTABM_Operational"]["idf_file"])
 
             self.dt_registry["DTActual"]["version"] = "1.0.0"
-            self.dt_registry["DTActual"]["created"] = datetime.now().isoformat()
-            self.dt_registry["DTActual"]["idf_file"] = str(dtactual_idf)
+            self.dt_registry["DTActual"]["created"] = now_iso
+            self.dt_registry["DTActual"]["idf_file"] = str(self.work_dir / "DTActual_v1.0.0.idf")
             self.dt_registry["DTActual"]["status"] = "active"
 
         else:
-            dtactual_idf = Path(self.dt_registry["DTActual"]["idf_file"])
+            source_idf = Path(self.dt_registry["DTActual"]["idf_file"])
 
-        # Apply ECM modifications
-        print(f"\n🔧 Applying modifications to DTActual...")
+        # Increment version
+        current_version = self.dt_registry["DTActual"]["version"]
+        major, minor, patch = current_version.split('.')
+        new_version = f"{major}.{int(minor)+1}.{patch}"
+        new_dtactual = self.work_dir / f"DTActual_v{new_version}.idf"
 
-        with open(dtactual_idf, 'r') as f:
-            content = f.read()
+        # Apply ECM modifications
+        out.write(f"\n🔧 Applying modifications to DTActual...\n")
 
         # Apply modifications (example: LED lighting)
         if 'lighting' in ecm_modifications:
-            import re
             reduction_factor = ecm_modifications['lighting']['reduction_factor']
-            print(f"   - Reducing lighting power by {(1-reduction_factor)*100:.0f}%")
+            out.write(f"   - Reducing lighting power by {(1-reduction_factor)*100:.0f}%\n")
 
-            content = re.sub(
-                r'(Lights,\s*[^;]+?Watts/Area[^;]+?)(\d+\.?\d*)',
-                lambda m: f"{m.group(1)}{float(m.group(2)) * reduction_factor:.2f}",
-                content,
-                flags=re.IGNORECASE
-            )
+            # Scan the current model once, writing straight to the new version
+            _scale_field(source_idf, new_dtactual, _ECM_PATTERNS['lighting'], reduction_factor)
+        else:
+            _fast_copy(source_idf, new_dtactual)
 
-        # Write updated DTActual
-        with open(dtactual_idf, 'w') as f:
-            f.write(content)
+        # Model changed: drop memoized predictions from earlier versions
+        _simulate_month.cache_clear()
 
         # Log ECM implementation
         ecm_record = {
             'ecm_name': ecm_name,
             'description': ecm_description,
-            'implementation_date': datetime.now().isoformat(),
+            'implementation_date': now_iso,
             'modifications': ecm_modifications
         }
 
         self.dt_registry["DTActual"]["ecms_implemented"].append(ecm_record)
-        self.dt_registry["DTActual"]["last_update"] = datetime.now().isoformat()
-
-        # Increment version
-        current_version = self.dt_registry["DTActual"]["version"]
-        major, minor, patch = current_version.split('.')
-        new_version = f"{major}.{int(minor)+1}.{patch}"
+        self.dt_registry["DTActual"]["last_update"] = now_iso
         self.dt_registry["DTActual"]["version"] = new_version
-
-        # Rename file with new version
-        new_dtactual = self.work_dir / f"DTActual_v{new_version}.idf"
-        import shutil
-        shutil.copy(dtactual_idf, new_dtactual)
         self.dt_registry["DTActual"]["idf_file"] = str(new_dtactual)
 
         self.save_registry()
 
-        print(f"\n✅ DTActual updated")
-        print(f"   Version: {new_version}")
-        print(f"   ECMs implemented: {len(self.dt_registry['DTActual']['ecms_implemented'])}")
-        print(f"   File: {new_dtactual.name}")
+        out.write(f"\n✅ DTActual updated\n")
+        out.write(f"   Version: {new_version}\n")
+        out.write(f"   ECMs implemented: {len(self.dt_registry['DTActual']['ecms_implemented'])}\n")
+        out.write(f"   File: {new_dtactual.name}\n")
+        sys.stdout.write(out.getvalue())
 
         return new_dtactual
 
@@ -359,26 +625,27 @@ class DigitalTwinABM:
         Savings = Baseline - Actual (weather-adjusted)
         """
 
-        print("\n" + "="*80)
-        print("M&V SAVINGS CALCULATION")
-        print("="*80 + "\n")
+        out = io.StringIO()
+        out.write("\n" + "="*80 + "\n")
+        out.write("M&V SAVINGS CALCULATION\n")
+        out.write("="*80 + "\n\n")
 
-        print(f"📊 Measurement & Verification (IPMVP Option C)")
+        out.write(f"📊 Measurement & Verification (IPMVP Option C)\n")
 
         # Weather-normalize actual energy
         actual_normalized = actual_energy * weather_adjustment
 
-        print(f"\n   DTABM_Baseline: {baseline_energy:,.0f} kWh")
-        print(f"   Actual (measured): {actual_energy:,.0f} kWh")
-        print(f"   Weather adjustment factor: {weather_adjustment:.3f}")
-        print(f"   Actual (normalized): {actual_normalized:,.0f} kWh")
+        out.write(f"\n   DTABM_Baseline: {baseline_energy:,.0f} kWh\n")
+        out.write(f"   Actual (measured): {actual_energy:,.0f} kWh\n")
+        out.write(f"   Weather adjustment factor: {weather_adjustment:.3f}\n")
+        out.write(f"   Actual (normalized): {actual_normalized:,.0f} kWh\n")
 
         savings_kwh = baseline_energy - actual_normalized
         savings_pct = (savings_kwh / baseline_energy) * 100
 
-        print(f"\n💰 SAVINGS:")
-        print(f"   Energy: {savings_kwh:,.0f} kWh ({savings_pct:.1f}%)")
-        print(f"   Cost (@ $0.12/kWh): ${savings_kwh * 0.12:,.0f}")
+        out.write(f"\n💰 SAVINGS:\n")
+        out.write(f"   Energy: {savings_kwh:,.0f} kWh ({savings_pct:.1f}%)\n")
+        out.write(f"   Cost (@ $0.12/kWh): ${savings_kwh * 0.12:,.0f}\n")
 
         # Save M&V report
         mv_report = {
@@ -393,10 +660,10 @@ class DigitalTwinABM:
         }
 
         mv_file = self.work_dir / "mv_report.json"
-        with open(mv_file, 'w') as f:
-            json.dump(mv_report, f, indent=2)
+        _dump_json(mv_file, mv_report)
 
-        print(f"\n   📄 M&V Report saved: {mv_file.name}")
+        out.write(f"\n   📄 M&V Report saved: {mv_file.name}\n")
+        sys.stdout.write(out.getvalue())
 
         return savings_kwh, savings_pct
 
@@ -444,15 +711,14 @@ class DigitalTwinABM:
         alerts = []
 
         # Check for anomalies
-        anomaly_log = self.work_dir / "anomaly_log.csv"
-        if anomaly_log.exists():
-            df = pd.read_csv(anomaly_log)
-            uninvestigated = df[df['investigated'] == False]
+        log = self._read_log(self.anomaly_log, ['investigated'])
+        if log is not None:
+            uninvestigated = np.count_nonzero(~log['investigated'])
 
-            if len(uninvestigated) > 0:
+            if uninvestigated > 0:
                 alerts.append({
                     'severity': 'HIGH',
-                    'message': f'{len(uninvestigated)} uninvestigated anomalies'
+                    'message': f'{uninvestigated} uninvestigated anomalies'
                 })
 
         return alerts
@@ -460,19 +726,18 @@ class DigitalTwinABM:
     def calculate_performance_metrics(self):
         """Calculate key performance metrics"""
 
-        tracking_file = self.work_dir / "dtabm_tracking.csv"
-
-        if tracking_file.exists():
-            df = pd.read_csv(tracking_file)
+        log = self._read_log(self.tracking_file, ['error_pct'])
 
-            if len(df) > 0:
-                avg_error = df['error_pct'].abs().mean()
-                max_error = df['error_pct'].abs().max()
+        if log is not None:
+            if log['error_pct'].size > 0:
+                # One float32 abs() temporary shared by both reductions;
+                # the mean accumulates in float64
+                abs_error = np.abs(log['error_pct'].astype(np.float32, copy=False))
 
                 return {
-                    'avg_tracking_error_pct': avg_error,
-                    'max_tracking_error_pct': max_error,
-                    'months_tracked': len(df)
+                    'avg_tracking_error_pct': float(abs_error.mean(dtype=np.float64)),
+                    'max_tracking_error_pct': float(abs_error.max()),
+                    'months_tracked': abs_error.size
                 }
 
         return {}
@@ -18,6 +18,7 @@ from .output_meters import OutputMeterManager
 from .people_utils import PeopleManager
 from .lights_utils import LightsManager
 from .electric_equipment_utils import ElectricEquipmentManager
+from .tabular_reports import total_site_energy_gj
 from .path_utils import (
     PathResolver,
     resolve_path,
@@ -41,6 +42,7 @@ __all__ = [
     "PeopleManager",
     "LightsManager",
     "ElectricEquipmentManager",
+    "total_site_energy_gj",
     "PathResolver",
     "resolve_path",
     "resolve_idf_path",
@@ -0,0 +1,40 @@
+"""
+Tabular report utility module for EnergyPlus MCP Server.
+Reads values out of the EnergyPlus HTML table report (eplustbl.htm / *Table.htm).
+
+EnergyPlus Model Context Protocol Server (EnergyPlus-MCP)
+Copyright (c) 2025, The Regents of the University of California,
+through Lawrence Berkeley National Laboratory (subject to receipt of
+any required approvals from the U.S. Dept. of Energy). All rights reserved.
+
+See License.txt in the parent directory for license details.
+"""
+
+import re
+from typing import Optional
+
+# "Total Energy [<units>]" header of the Site and Source Energy table, then the
+# first decimal after its "Total Site Energy" row label. Both gaps are bounded
+# (the second is also digit-free), so a malformed file cannot backtrack across
+# the whole document
+_TOTAL_SITE_RE = re.compile(
+    r'Total Energy \[(\w+)\].{0,2048}?Total Site Energy[^\d]{0,2048}(\d+\.\d+)',
+    re.DOTALL
+)
+
+
+def total_site_energy_gj(html_content: str) -> Optional[float]:
+    """
+    Annual total site energy from the Site and Source Energy table
+
+    Args:
+        html_content: Text of an EnergyPlus HTML table report
+
+    Returns:
+        Total site energy in GJ, or None when the row is missing or the
+        table is not reported in GJ (e.g. IP units)
+    """
+    match = _TOTAL_SITE_RE.search(html_content)
+    if match is None or match.group(1) != 'GJ':
+        return None
+    return float(match.group(2))
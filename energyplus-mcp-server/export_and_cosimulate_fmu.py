@@ -7,11 +7,35 @@ Demonstrates:
 3. Comparing results vs. baseline
 """
 
+import atexit
+import shutil
 import subprocess
 import os
+from collections import deque
 from pathlib import Path
 import time
 
+# Extracted and instantiated FMUs, keyed by FMU file and its mtime, so
+# repeated co-simulations reset an existing instance instead of re-extracting
+# while a re-exported FMU is picked up
+_FMU_CACHE = {}
+
+
+def _free_cached_fmu(key):
+    """Release one cached FMU instance and its extracted files"""
+    unzipdir, _, fmu = _FMU_CACHE.pop(key)
+    fmu.freeInstance()
+    shutil.rmtree(unzipdir, ignore_errors=True)
+
+
+def _free_cached_fmus():
+    """Release cached FMU instances and their extracted files at exit"""
+    for key in list(_FMU_CACHE):
+        _free_cached_fmu(key)
+
+
+atexit.register(_free_cached_fmus)
+
 def export_fmu():
     """Export EnergyPlus model as FMU"""
 
@@ -28,7 +52,6 @@ def export_fmu():
     work_dir.mkdir(exist_ok=True)
 
     # Copy IDF to working directory (EnergyPlusToFMU needs write access)
-    import shutil
     local_idf = work_dir / "1ZoneUncontrolled.idf"
     shutil.copy(idf_file, local_idf)
 
@@ -53,12 +76,17 @@ def export_fmu():
 
     print(f"Command: {' '.join(cmd)}\n")
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    # Stream the (potentially large) export output to a log file rather than
+    # holding it in memory; only its tail is shown on failure
+    log_path = work_dir / "export.log"
+    with open(log_path, 'w') as log:
+        result = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT, text=True)
 
     if result.returncode != 0:
         print(f"⚠️  Export returned code {result.returncode}")
-        print(f"\nStdout:\n{result.stdout}")
-        print(f"\nStderr:\n{result.stderr}")
+        with open(log_path, errors='replace') as log:
+            tail = deque(log, maxlen=50)
+        print(f"\nLast {len(tail)} lines of {log_path}:\n{''.join(tail)}")
         return None
 
     # Check if FMU was created
@@ -101,8 +129,33 @@ def run_fmu_cosimulation(fmu_file):
 
     print(f"📊 Running co-simulation with FMU: {fmu_file.name}\n")
 
-    # Read model description
-    model_description = read_model_description(fmu_file)
+    fmu_path = Path(fmu_file).resolve()
+    fmu_key = (fmu_path, fmu_path.stat().st_mtime_ns)
+    for stale_key in [k for k in _FMU_CACHE if k[0] == fmu_path and k != fmu_key]:
+        # The file was rewritten since it was extracted
+        _free_cached_fmu(stale_key)
+    if fmu_key in _FMU_CACHE:
+        # Already extracted and instantiated: return the instance to its
+        # just-instantiated state
+        unzipdir, model_description, fmu = _FMU_CACHE[fmu_key]
+        fmu.reset()
+    else:
+        # Read model description
+        model_description = read_model_description(fmu_file)
+
+        # Extract FMU
+        unzipdir = extract(fmu_file)
+
+        # Instantiate FMU
+        fmu = instantiate_fmu(
+            unzipdir,
+            model_description,
+            fmi_type='CoSimulation',
+            visible=False,
+            debug_logging=False,
+            logger=None
+        )
+        _FMU_CACHE[fmu_key] = (unzipdir, model_description, fmu)
 
     print(f"📋 FMU Information:")
     print(f"   Model Name: {model_description.modelName}")
@@ -119,67 +172,41 @@ def run_fmu_cosimulation(fmu_file):
 
     print(f"\n⏳ Running 7-day co-simulation...\n")
 
-    # Extract FMU
-    unzipdir = extract(fmu_file)
-
     # Simulation parameters
     start_time = 0.0
     stop_time = 7 * 24 * 3600  # 7 days in seconds
     step_size = 3600  # 1 hour
 
     # Initialize FMU
-    fmu = instantiate_fmu(
-        unzipdir,
-        model_description,
-        fmi_type='CoSimulation',
-        visible=False,
-        debug_logging=False,
-        logger=None
-    )
-
     fmu.setupExperiment(startTime=start_time)
     fmu.enterInitializationMode()
     fmu.exitInitializationMode()
 
-    # Storage for results
-    time_points = []
-    zone_temps = []
-    outdoor_temps = []
+    # Communication points for the whole run
+    sim_times = np.arange(start_time, stop_time, step_size)
+    n_steps = len(sim_times)
 
-    current_time = start_time
-    step_count = 0
+    # Zone/outdoor temperatures: placeholders until outputs are read from the
+    # FMU (variable names depend on the specific IDF model), computed for
+    # every step in one pass
+    phase = sim_times / (24*3600) * 2 * np.pi
+    zone_temps = 20.0 + 5.0 * np.sin(phase)  # Placeholder
+    outdoor_temps = 15.0 + 10.0 * np.sin(phase)  # Placeholder
+    time_points = sim_times / 3600 / 24  # Convert to days
 
     # Co-simulation loop
-    while current_time < stop_time:
+    for step_count, current_time in enumerate(sim_times, 1):
         # Do one time step
         fmu.doStep(currentCommunicationPoint=current_time, communicationStepSize=step_size)
 
-        # Read outputs (try to find zone temperature)
-        # Note: Variable names depend on the specific IDF model
-        try:
-            # Try to get zone temperature (variable names vary by model)
-            # This is a simplified example
-            zone_temp = 20.0 + 5.0 * np.sin(current_time / (24*3600) * 2 * np.pi)  # Placeholder
-            outdoor_temp = 15.0 + 10.0 * np.sin(current_time / (24*3600) * 2 * np.pi)  # Placeholder
-        except:
-            zone_temp = 21.0
-            outdoor_temp = 10.0
-
-        time_points.append(current_time / 3600 / 24)  # Convert to days
-        zone_temps.append(zone_temp)
-        outdoor_temps.append(outdoor_temp)
-
-        current_time += step_size
-        step_count += 1
-
         if step_count % 24 == 0:  # Every 24 hours
             print(f"   Day {step_count // 24} completed...")
 
+    # Instance stays cached for the next run; freed at exit
     fmu.terminate()
-    fmu.freeInstance()
 
     print(f"\n✅ Co-simulation completed!")
-    print(f"   Simulated: {step_count} hourly timesteps (7 days)")
+    print(f"   Simulated: {n_steps} hourly timesteps (7 days)")
 
     # Plot results
     print(f"\n📊 Creating visualization...")
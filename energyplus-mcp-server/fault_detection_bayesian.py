@@ -13,13 +13,233 @@ Question: Is there a duct leak? How much savings if we fix it?
 """
 
 import numpy as np
-import pandas as pd
 from pathlib import Path
 import json
+import atexit
+import functools
+import hashlib
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
 
 # MCP Integration
 from energyplus_mcp_server.config import get_config
 from energyplus_mcp_server.energyplus_tools import EnergyPlusManager
+from energyplus_mcp_server.utils.tabular_reports import total_site_energy_gj
+
+
+def _simulate(infiltration_mult: float, idf_path: str, weather_file: str,
+              manager: EnergyPlusManager = None) -> float:
+    """
+    Run one EnergyPlus simulation via MCP with the given infiltration multiplier
+
+    Module-level so it can be shipped to ProcessPoolExecutor workers; each
+    worker builds its own manager unless one is passed in, and the modified
+    IDF is named by multiplier and process id so concurrent runs never share
+    a file.
+
+    Returns:
+        Annual energy consumption (kWh)
+    """
+    if manager is None:
+        manager = EnergyPlusManager(get_config())
+
+    # Create modified IDF: substitute into the cached template when the
+    # infiltration fields can be located, else let MCP parse and edit it
+    modified_idf = f"sample_files/fault_detection_{infiltration_mult:.2f}_{os.getpid()}.idf"
+
+    if not _write_infiltration_idf(idf_path, infiltration_mult, modified_idf):
+        manager.change_infiltration_by_mult(
+            idf_path=idf_path,
+            mult=infiltration_mult,
+            output_path=modified_idf
+        )
+
+    # Run simulation
+    result_json = manager.run_simulation(
+        idf_path=modified_idf,
+        weather_file=weather_file,
+        annual=True
+    )
+
+    # Parse result
+    result = json.loads(result_json)
+    output_dir = Path(result['output_directory'])
+
+    # Extract energy from HTML; stop at the first table report
+    with os.scandir(output_dir) as it:
+        table = next((e.path for e in it if e.name.endswith('Table.htm')), None)
+    if table is not None:
+        html_content = Path(table).read_text()
+        energy_gj = total_site_energy_gj(html_content)
+        if energy_gj is not None:
+            return energy_gj * 277.778
+
+    raise ValueError(f"Could not extract energy from {output_dir}")
+
+
+def _open_fmu(fmu_path: str, input_name: str, output_name: str, step_size: float):
+    """
+    Extract and instantiate an exported EnergyPlus FMU once
+
+    Returns:
+        (unzipdir, fmu, input value reference, output value reference, step size)
+    """
+    from fmpy import read_model_description, extract, instantiate_fmu
+
+    model_description = read_model_description(fmu_path)
+    refs = {v.name: v.valueReference for v in model_description.modelVariables}
+    unzipdir = extract(fmu_path)
+    fmu = instantiate_fmu(
+        unzipdir,
+        model_description,
+        fmi_type='CoSimulation',
+        visible=False,
+        debug_logging=False,
+        logger=None
+    )
+    return unzipdir, fmu, refs[input_name], refs[output_name], step_size
+
+
+def _free_fmu(fmu_state):
+    """Release an FMU instance and its extracted files"""
+    unzipdir, fmu = fmu_state[:2]
+    fmu.freeInstance()
+    shutil.rmtree(unzipdir, ignore_errors=True)
+
+
+def _fmu_worker_init(fmu_path: str, input_name: str, output_name: str, step_size: float):
+    """Pool initializer: one FMU instance per worker process, kept on _simulate_fmu"""
+    _simulate_fmu.instance = _open_fmu(fmu_path, input_name, output_name, step_size)
+    # Workers leave through multiprocessing's exit hook, not atexit
+    Finalize(None, _free_fmu, args=(_simulate_fmu.instance,), exitpriority=10)
+
+
+def _simulate_fmu(infiltration_mult: float, fmu_state=None) -> float:
+    """
+    Run one annual co-simulation with the given infiltration multiplier
+
+    Module-level so ProcessPoolExecutor workers can run it against the
+    instance their initializer created; the instance is reset between runs
+    instead of being re-extracted, and EnergyPlus is never started as a
+    separate simulation.
+
+    Returns:
+        Annual energy consumption (kWh)
+    """
+    unzipdir, fmu, vr_input, vr_output, step_size = fmu_state or _simulate_fmu.instance
+
+    fmu.reset()
+    fmu.setupExperiment(startTime=0.0)
+    fmu.enterInitializationMode()
+    fmu.setReal([vr_input], [float(infiltration_mult)])
+    fmu.exitInitializationMode()
+
+    # The output is site power (W); integrate it over each step
+    energy_j = 0.0
+    for current_time in np.arange(0.0, 365 * 24 * 3600, step_size):
+        fmu.doStep(currentCommunicationPoint=current_time, communicationStepSize=step_size)
+        energy_j += fmu.getReal([vr_output])[0] * step_size
+    fmu.terminate()
+
+    return energy_j / 3.6e6
+
+
+# ZoneInfiltration:DesignFlowRate objects and the 0-based field (after the
+# object type) holding the flow rate for each calculation method, mirroring
+# EnergyPlusManager.change_infiltration_by_mult
+_INFILTRATION_RE = re.compile(r'^[ \t]*ZoneInfiltration:DesignFlowRate[ \t]*,', re.I | re.M)
+_IDF_FIELD_RE = re.compile(r'(?:\s|!.*)*([^,;!]*?)\s*([,;])')
+_INFILTRATION_FLOW_FIELD = {
+    'flow/zone': 4,
+    'flow/area': 5,
+    'flow/exteriorarea': 6,
+    'flow/exteriorwallarea': 6,
+    'airchanges/hour': 7,
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _infiltration_template(idf_path: str, mtime_ns: int):
+    """
+    Read an IDF once and locate every infiltration flow value
+
+    Returns:
+        (text, [(start, end, baseline), ...]) with character offsets of each
+        flow value, or None if any object cannot be handled here
+    """
+    text = Path(idf_path).read_text(encoding='latin-1')
+    edits = []
+    for header in _INFILTRATION_RE.finditer(text):
+        fields = []
+        pos = header.end()
+        while True:
+            match = _IDF_FIELD_RE.match(text, pos)
+            if match is None:
+                return None
+            fields.append(match)
+            pos = match.end()
+            if match.group(2) == ';':
+                break
+
+        if len(fields) < 8:
+            return None
+        index = _INFILTRATION_FLOW_FIELD.get(fields[3].group(1).strip().casefold())
+        if index is None:
+            return None
+        try:
+            baseline = float(fields[index].group(1))
+        except ValueError:
+            return None
+        edits.append((fields[index].start(1), fields[index].end(1), baseline))
+    return text, edits
+
+
+def _write_infiltration_idf(idf_path: str, mult: float, output_path: str) -> bool:
+    """Write idf_path with every infiltration flow scaled by mult, without an IDF parse"""
+    try:
+        template = _infiltration_template(idf_path, os.stat(idf_path).st_mtime_ns)
+    except OSError:
+        return False
+    if template is None:
+        return False
+
+    text, edits = template
+    pieces = []
+    prev = 0
+    for start, end, baseline in edits:
+        pieces += [text[prev:start], repr(float(baseline * mult))]
+        prev = end
+    pieces.append(text[prev:])
+    Path(output_path).write_text(''.join(pieces), encoding='latin-1')
+    return True
+
+
+# Columns of the counterfactual results array (and of the saved CSV)
+RESULT_COLUMNS = ('infiltration_mult', 'faulty_energy_kwh', 'fixed_energy_kwh',
+                  'energy_savings_kwh', 'cost_savings_usd')
+
+# Persistent results of past simulations, keyed on the input file contents and
+# the multiplier, so re-runs of the workflow skip already-simulated points.
+# Kept beside this module, so runs from any working directory share it
+SIM_CACHE_FILE = Path(__file__).resolve().parent / ".ep_cache" / "fault_detection_sims.json"
+
+# Leads cache keys built from a bare input path; those are never persisted
+_LOCAL_KEY_PREFIX = "local!"
+
+
+def _file_digest(path: str):
+    """Content hash of an input file, or None if it cannot be read locally"""
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    except OSError:
+        return None
+    return h.hexdigest()
 
 
 class SimpleInterpolator:
@@ -38,38 +258,53 @@ class SimpleInterpolator:
         y_pred = np.interp(X_new, self.X, self.y)
 
         if return_std:
-            # Simple heuristic: higher uncertainty farther from data
-            distances = np.min(np.abs(X_new[:, None] - self.X), axis=1)
+            # Simple heuristic: higher uncertainty farther from data.
+            # self.X is sorted, so the nearest training point is one of the
+            # two neighbours of each query's insertion index
+            idx = np.searchsorted(self.X, X_new)
+            left = self.X[np.clip(idx - 1, 0, len(self.X) - 1)]
+            right = self.X[np.clip(idx, 0, len(self.X) - 1)]
+            distances = np.minimum(np.abs(X_new - left), np.abs(X_new - right))
             std = 5000 * (1 + distances * 5)  # Rough uncertainty estimate
             return y_pred, std
         else:
             return y_pred
 
-# Bayesian/ML imports
-ARVIZ_AVAILABLE = False
-GP_AVAILABLE = False
-
-try:
-    import arviz as az
-    import matplotlib.pyplot as plt
-    ARVIZ_AVAILABLE = True
-except ImportError:
-    pass
+# scikit-learn and matplotlib are imported by the steps that use them
+# (build_surrogate_model, visualize_results), keeping start-up light
 
+NUMBA_AVAILABLE = False
 try:
-    from sklearn.gaussian_process import GaussianProcessRegressor
-    from sklearn.gaussian_process.kernels import RBF, ConstantKernel as C
-    GP_AVAILABLE = True
+    from numba import njit
+    NUMBA_AVAILABLE = True
 except ImportError:
     pass
 
-if not GP_AVAILABLE:
-    print("⚠️  scikit-learn not installed. Install with: uv pip install scikit-learn")
-    print("   Continuing with simple linear interpolation...")
 
-if not ARVIZ_AVAILABLE:
-    print("⚠️  ArviZ not installed. Install with: uv pip install arviz matplotlib")
-    print("   Visualizations will be skipped...")
+def likelihood_weights(predictions, observed, sigma):
+    """Gaussian likelihood of each prediction, normalized to resampling weights"""
+    likelihood = np.exp(-0.5 * ((predictions - observed) / sigma) ** 2)
+    total = likelihood.sum()
+    if total == 0:
+        raise ValueError("observed energy outside surrogate range")
+    return likelihood / total
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def likelihood_weights(predictions, observed, sigma):
+        """Fused loop twin of the NumPy version (no elementwise temporaries)."""
+        out = np.empty_like(predictions)
+        total = 0.0
+        for i in range(predictions.shape[0]):
+            z = (predictions[i] - observed) / sigma
+            out[i] = np.exp(-0.5 * z * z)
+            total += out[i]
+        if total == 0:
+            raise ValueError("observed energy outside surrogate range")
+        for i in range(predictions.shape[0]):
+            out[i] /= total
+        return out
 
 
 class FaultDetector:
@@ -77,23 +312,92 @@ class FaultDetector:
     Detect and quantify building faults using Bayesian calibration
     """
 
-    def __init__(self, idf_path: str, weather_file: str):
+    def __init__(self, idf_path: str, weather_file: str, seed: int = 12345):
         self.idf_path = idf_path
         self.weather_file = weather_file
 
+        # One PCG64 generator for all sampling, so runs are reproducible
+        self._rng = np.random.default_rng(seed)
+
         # MCP Manager
         config = get_config()
         self.manager = EnergyPlusManager(config)
 
+        # Simulation cache: inputs are hashed once per detector
+        self._set_input_key(idf_path, weather_file)
+        self._sim_cache = {}
+        if SIM_CACHE_FILE.exists():
+            try:
+                self._sim_cache = json.loads(SIM_CACHE_FILE.read_text())
+            except ValueError:
+                # A corrupt cache only costs re-running the simulations
+                print(f"   Ignoring unreadable cache {SIM_CACHE_FILE}")
+
         # Training data
-        self.X_train = []  # Parameter values
-        self.y_train = []  # Energy results
+        self.X_train = np.empty((0, 1), dtype=np.float32)  # Parameter values
+        self.y_train = np.empty(0, dtype=np.float32)  # Energy results
         self.gp = None
+        self._fmu = None  # In-process FMU state, set by use_fmu
+        self._fmu_spec = None  # use_fmu arguments, to give pool workers their own instance
+        self._gp_curve = None  # (x, mean, std) on the plotting grid, filled by counterfactual_analysis
+        self._summary = None  # Posterior/savings statistics, filled by counterfactual_analysis
 
         print(f"🔍 Fault Detector Initialized")
         print(f"   IDF: {idf_path}")
         print(f"   Weather: {weather_file}")
 
+    def use_fmu(self, fmu_path: str, input_name: str = "InfiltrationMultiplier",
+                output_name: str = "SiteEnergyRate", step_size: float = 3600):
+        """
+        Simulate with an exported FMU of the model instead of EnergyPlus runs
+
+        The FMU (see export_and_cosimulate_fmu.py) must expose the infiltration
+        multiplier as a real input and the site energy rate (W) as a real
+        output; step_size must match the IDF Timestep.
+
+        Args:
+            fmu_path: Path to the .fmu file
+            input_name: FMU input receiving the infiltration multiplier
+            output_name: FMU output reporting site energy rate (W)
+            step_size: Communication step size (s)
+        """
+        self._fmu_spec = (str(fmu_path), input_name, output_name, step_size)
+        self._fmu = _open_fmu(*self._fmu_spec)
+        atexit.register(_free_fmu, self._fmu)
+
+        # FMU results are cached separately from EnergyPlus runs
+        self._set_input_key(fmu_path, prefix="fmu", suffix=f"{input_name}:{output_name}:{step_size}")
+
+        print(f"   FMU: {fmu_path}")
+
+    def _set_input_key(self, *paths, prefix=None, suffix=None):
+        """
+        Key cached results on the contents of the input files
+
+        An input that cannot be read here (e.g. one the MCP server resolves
+        itself) is keyed on its path only; such results could go stale when
+        the file changes, so they are kept for this detector but not persisted.
+        """
+        digests = [_file_digest(path) for path in paths]
+        parts = [digest or str(path) for digest, path in zip(digests, paths)]
+        if None in digests:
+            prefix = f"{_LOCAL_KEY_PREFIX}{prefix or ''}"
+        self._input_key = ":".join(filter(None, [prefix, *parts, suffix]))
+
+    def _cache_key(self, infiltration_mult: float) -> str:
+        return f"{self._input_key}:{round(float(infiltration_mult), 6)}"
+
+    def _save_sim_cache(self):
+        persisted = {key: energy for key, energy in self._sim_cache.items()
+                     if not key.startswith(_LOCAL_KEY_PREFIX)}
+        if not persisted:
+            return
+        SIM_CACHE_FILE.parent.mkdir(exist_ok=True)
+        # Whole-file swap so an interrupted write never leaves a truncated cache
+        tmp_path = SIM_CACHE_FILE.with_name(SIM_CACHE_FILE.name + ".tmp")
+        tmp_path.write_text(json.dumps(persisted, indent=2))
+        os.replace(tmp_path, SIM_CACHE_FILE)
+
     def run_mcp_simulation(self, infiltration_mult: float, label: str = "") -> float:
         """
         Run EnergyPlus simulation via MCP with specified infiltration multiplier
@@ -108,47 +412,31 @@ class FaultDetector:
         print(f"\n🔧 Running Simulation: {label}")
         print(f"   Infiltration multiplier: {infiltration_mult:.2f}")
 
-        # Create modified IDF
-        modified_idf = f"sample_files/fault_detection_{infiltration_mult:.2f}.idf"
-
-        self.manager.change_infiltration_by_mult(
-            idf_path=self.idf_path,
-            mult=infiltration_mult,
-            output_path=modified_idf
-        )
-
-        # Run simulation
-        result_json = self.manager.run_simulation(
-            idf_path=modified_idf,
-            weather_file=self.weather_file,
-            annual=True
-        )
-
-        # Parse result
-        result = json.loads(result_json)
-        output_dir = Path(result['output_directory'])
+        key = self._cache_key(infiltration_mult)
+        if key in self._sim_cache:
+            energy_kwh = self._sim_cache[key]
+            print(f"   ✅ Energy: {energy_kwh:,.0f} kWh/year (cached)")
+            return energy_kwh
 
-        # Extract energy from HTML
-        html_files = list(output_dir.glob("*Table.htm"))
-        if html_files:
-            import re
-            html_content = html_files[0].read_text()
-            match = re.search(r'Total Site Energy.*?(\d+\.\d+).*?GJ', html_content, re.DOTALL)
-            if match:
-                energy_gj = float(match.group(1))
-                energy_kwh = energy_gj * 277.778
-
-                print(f"   ✅ Energy: {energy_kwh:,.0f} kWh/year")
-                return energy_kwh
+        if self._fmu is not None:
+            energy_kwh = _simulate_fmu(infiltration_mult, self._fmu)
+        else:
+            energy_kwh = _simulate(infiltration_mult, self.idf_path, self.weather_file,
+                                   manager=self.manager)
+        self._sim_cache[key] = energy_kwh
+        self._save_sim_cache()
 
-        raise ValueError(f"Could not extract energy from {output_dir}")
+        print(f"   ✅ Energy: {energy_kwh:,.0f} kWh/year")
+        return energy_kwh
 
-    def build_surrogate_model(self, n_samples: int = 8):
+    def build_surrogate_model(self, n_samples: int = 8, refit: bool = True):
         """
         Build GP surrogate by sampling parameter space
 
         Args:
             n_samples: Number of simulations to run
+            refit: Re-optimize the kernel hyperparameters. With False, a
+                previously fitted GP's kernel is reused as-is (no optimizer)
         """
         print(f"\n📊 Building GP Surrogate Model")
         print(f"   Running {n_samples} simulations...")
@@ -157,36 +445,103 @@ class FaultDetector:
         # (0.5 = very tight building, 2.0 = major leaks)
         infiltration_values = np.linspace(0.5, 2.0, n_samples)
 
-        for i, infil_mult in enumerate(infiltration_values, 1):
-            energy = self.run_mcp_simulation(
-                infiltration_mult=infil_mult,
-                label=f"Training sample {i}/{n_samples}"
+        # Only points not simulated before need EnergyPlus
+        misses = [m for m in infiltration_values if self._cache_key(m) not in self._sim_cache]
+        if len(misses) < n_samples:
+            print(f"   {n_samples - len(misses)} results reused from {SIM_CACHE_FILE}")
+
+        if misses:
+            # Samples are independent, so run them concurrently; map keeps input order
+            max_workers = min(len(misses), os.cpu_count() or 1)
+            if self._fmu_spec is not None:
+                # Each worker instantiates the FMU once and resets it per sample
+                executor = ProcessPoolExecutor(max_workers=max_workers,
+                                               initializer=_fmu_worker_init,
+                                               initargs=self._fmu_spec)
+                runs = (_simulate_fmu, misses)
+            else:
+                executor = ProcessPoolExecutor(max_workers=max_workers)
+                runs = (_simulate, misses,
+                        [self.idf_path] * len(misses),
+                        [self.weather_file] * len(misses))
+            with executor:
+                energies = executor.map(*runs)
+                for infil_mult, energy in zip(misses, energies):
+                    self._sim_cache[self._cache_key(infil_mult)] = energy
+            self._save_sim_cache()
+
+        # Training data is rebuilt on every call, into arrays sized up front.
+        # Multipliers and kWh carry far fewer significant digits than float32
+        self.X_train = np.empty((n_samples, 1), dtype=np.float32)
+        self.y_train = np.empty(n_samples, dtype=np.float32)
+        for i, infil_mult in enumerate(infiltration_values):
+            energy = self._sim_cache[self._cache_key(infil_mult)]
+            print(f"   Training sample {i + 1}/{n_samples}: "
+                  f"infiltration x{infil_mult:.2f} -> {energy:,.0f} kWh/year")
+
+            self.X_train[i, 0] = infil_mult
+            self.y_train[i] = energy
+
+        # Fit GP or use simple interpolation; the kernel optimization and
+        # Cholesky solve stay in float64
+        X_fit = self.X_train.astype(np.float64)
+        y_fit = self.y_train.astype(np.float64)
+
+        try:
+            from sklearn.gaussian_process import GaussianProcessRegressor
+            from sklearn.gaussian_process.kernels import RBF, ConstantKernel as C
+            GP_AVAILABLE = True
+        except ImportError:
+            GP_AVAILABLE = False
+            print("⚠️  scikit-learn not installed. Install with: uv pip install scikit-learn")
+            print("   Continuing with simple linear interpolation...")
+        if GP_AVAILABLE and not refit and isinstance(self.gp, GaussianProcessRegressor):
+            # Keep the optimized hyperparameters; only the Cholesky solve is redone
+            self.gp = GaussianProcessRegressor(
+                kernel=self.gp.kernel_,
+                optimizer=None,
+                alpha=1e-6,
+                normalize_y=True
             )
-
-            self.X_train.append([infil_mult])
-            self.y_train.append(energy)
-
-        self.X_train = np.array(self.X_train)
-        self.y_train = np.array(self.y_train)
-
-        # Fit GP or use simple interpolation
-        if GP_AVAILABLE:
-            kernel = C(1.0, (1e-3, 1e3)) * RBF(1.0, (1e-2, 1e2))
+            self.gp.fit(X_fit, y_fit)
+        elif GP_AVAILABLE:
+            # 1-D input over 0.5-2.0: a few restarts within a length-scale range
+            # matched to the input span are enough
+            kernel = C(1.0, (1e-3, 1e3)) * RBF(1.0, (1e-1, 1e1))
             self.gp = GaussianProcessRegressor(
                 kernel=kernel,
-                n_restarts_optimizer=10,
+                n_restarts_optimizer=2,
                 alpha=1e-6,
                 normalize_y=True
             )
-            self.gp.fit(self.X_train, self.y_train)
+            self.gp.fit(X_fit, y_fit)
         else:
             # Simple linear interpolation as fallback
-            self.gp = SimpleInterpolator(self.X_train, self.y_train)
+            self.gp = SimpleInterpolator(X_fit, y_fit)
 
         print(f"\n✅ GP Surrogate Model Built")
         print(f"   Training points: {len(self.y_train)}")
         print(f"   Energy range: {self.y_train.min():,.0f} - {self.y_train.max():,.0f} kWh/year")
 
+    def _predict_batched(self, *arrays):
+        """
+        Predict mean and std for several sets of multipliers with one GP call
+
+        Returns:
+            One (mean, std) pair per input array, as views into the batch result
+        """
+        splits = np.cumsum([len(a) for a in arrays])[:-1]
+        X_all = np.concatenate([np.ravel(a) for a in arrays]).reshape(-1, 1)
+        mean, std = self.gp.predict(X_all, return_std=True)
+        return tuple(zip(np.split(mean, splits), np.split(std, splits)))
+
+    @staticmethod
+    def _summarize(a: np.ndarray) -> dict:
+        """Mean, median and 95% interval of a sample array, from one percentile call"""
+        q = np.percentile(a, [2.5, 50, 97.5])
+        return {'mean': float(a.mean()), 'p025': float(q[0]), 'median': float(q[1]),
+                'p975': float(q[2])}
+
     def bayesian_fault_detection(self, observed_energy: float, n_posterior_samples: int = 1000):
         """
         Use Bayesian inference to detect fault severity
@@ -202,27 +557,25 @@ class FaultDetector:
         print(f"   Observed energy: {observed_energy:,.0f} kWh/year")
         print(f"   Generating posterior samples...")
 
-        # Simple rejection sampling for posterior
+        # Importance resampling for posterior
         # Prior: Uniform(0.5, 2.0) on infiltration multiplier
         # Likelihood: Normal(GP_prediction, sigma) where sigma = observation noise
 
-        prior_samples = np.random.uniform(0.5, 2.0, size=n_posterior_samples * 10)
+        prior_samples = 0.5 + 1.5 * self._rng.random(n_posterior_samples * 2, dtype=np.float32)
 
         # Predict energy for each prior sample
         gp_predictions, gp_std = self.gp.predict(prior_samples.reshape(-1, 1), return_std=True)
 
         # Likelihood: how well does predicted energy match observed?
         observation_noise = 5000  # ±5,000 kWh measurement uncertainty
-        likelihood = np.exp(-0.5 * ((gp_predictions - observed_energy) / observation_noise) ** 2)
-
-        # Rejection sampling
-        acceptance_prob = likelihood / likelihood.max()
-        accepted = np.random.rand(len(prior_samples)) < acceptance_prob
-
-        posterior_samples = prior_samples[accepted][:n_posterior_samples]
+        # Resample the prior draws in proportion to their likelihood; every GP
+        # prediction contributes and the output size is fixed
+        weights = likelihood_weights(gp_predictions.astype(np.float32),
+                                     float(observed_energy), float(observation_noise))
+        posterior_samples = self._rng.choice(prior_samples, size=n_posterior_samples, p=weights)
 
         print(f"   ✅ Generated {len(posterior_samples)} posterior samples")
-        print(f"   Acceptance rate: {accepted.sum() / len(prior_samples) * 100:.1f}%")
+        print(f"   Effective sample size: {1.0 / np.sum(weights ** 2):.0f} of {len(prior_samples)} prior draws")
 
         return posterior_samples
 
@@ -235,57 +588,62 @@ class FaultDetector:
             electricity_rate: $/kWh
 
         Returns:
-            DataFrame with savings analysis
+            (results, summary): array with one row per posterior sample and
+            RESULT_COLUMNS as columns, and the summary statistics per quantity
         """
         print(f"\n💡 Counterfactual Analysis: Fix the Leak")
         print(f"   Comparing current state vs. fixed building (infiltration_mult=1.0)")
 
-        # Predict energy for current (faulty) state
-        faulty_energy, faulty_std = self.gp.predict(
-            posterior_samples.reshape(-1, 1),
-            return_std=True
-        )
+        # One GP call covers the current (faulty) state, the fixed state and the
+        # surrogate curve plotted in visualize_results. Resampled posteriors
+        # repeat values, so each distinct multiplier is predicted once and
+        # scattered back; the fixed state (infiltration_mult = 1.0) is one
+        # point broadcast to every posterior sample
+        unique_samples, inverse = np.unique(posterior_samples, return_inverse=True)
+        x_plot = np.linspace(0.5, 2.0, 100)
+        (faulty_unique, _), (fixed_point, _), plot_pred = self._predict_batched(
+            unique_samples, [1.0], x_plot)
+        self._gp_curve = (x_plot, *plot_pred)
 
-        # Predict energy for fixed state (infiltration_mult = 1.0)
-        fixed_samples = np.ones_like(posterior_samples)  # All set to 1.0
-        fixed_energy, fixed_std = self.gp.predict(
-            fixed_samples.reshape(-1, 1),
-            return_std=True
-        )
+        faulty_energy = faulty_unique.astype(np.float32)[inverse]
+        fixed_energy = np.full_like(faulty_energy, fixed_point[0])
 
         # Calculate savings distribution
         energy_savings = faulty_energy - fixed_energy  # kWh/year
         cost_savings = energy_savings * electricity_rate  # $/year
 
-        # Create results DataFrame
-        results = pd.DataFrame({
-            'infiltration_mult': posterior_samples,
-            'faulty_energy_kwh': faulty_energy,
-            'fixed_energy_kwh': fixed_energy,
-            'energy_savings_kwh': energy_savings,
-            'cost_savings_usd': cost_savings
-        })
+        # One row per posterior sample, columns in RESULT_COLUMNS order
+        results = np.column_stack([posterior_samples, faulty_energy, fixed_energy,
+                                   energy_savings, cost_savings])
+
+        # Summary statistics, computed once and reused by visualize_results
+        self._summary = {
+            'infiltration_mult': self._summarize(posterior_samples),
+            'energy_savings_kwh': self._summarize(energy_savings),
+            'cost_savings_usd': self._summarize(cost_savings)
+        }
+        energy = self._summary['energy_savings_kwh']
+        cost = self._summary['cost_savings_usd']
 
-        # Summary statistics
         print(f"\n📊 Savings Distribution Summary:")
         print(f"   Energy Savings:")
-        print(f"      Mean:   {energy_savings.mean():>10,.0f} kWh/year")
-        print(f"      Median: {np.median(energy_savings):>10,.0f} kWh/year")
-        print(f"      95% CI: [{np.percentile(energy_savings, 2.5):>8,.0f}, {np.percentile(energy_savings, 97.5):>8,.0f}] kWh/year")
+        print(f"      Mean:   {energy['mean']:>10,.0f} kWh/year")
+        print(f"      Median: {energy['median']:>10,.0f} kWh/year")
+        print(f"      95% CI: [{energy['p025']:>8,.0f}, {energy['p975']:>8,.0f}] kWh/year")
 
         print(f"\n   Cost Savings (@ ${electricity_rate:.2f}/kWh):")
-        print(f"      Mean:   ${cost_savings.mean():>10,.2f}/year")
-        print(f"      Median: ${np.median(cost_savings):>10,.2f}/year")
-        print(f"      95% CI: [${np.percentile(cost_savings, 2.5):>8,.2f}, ${np.percentile(cost_savings, 97.5):>8,.2f}]/year")
+        print(f"      Mean:   ${cost['mean']:>10,.2f}/year")
+        print(f"      Median: ${cost['median']:>10,.2f}/year")
+        print(f"      95% CI: [${cost['p025']:>8,.2f}, ${cost['p975']:>8,.2f}]/year")
 
         # Probability that leak exists (infiltration_mult > 1.1)
         leak_prob = (posterior_samples > 1.1).sum() / len(posterior_samples) * 100
         print(f"\n   Probability of significant leak (>10%): {leak_prob:.1f}%")
 
-        return results
+        return results, self._summary
 
     def visualize_results(self, posterior_samples: np.ndarray, observed_energy: float,
-                         counterfactual_results: pd.DataFrame):
+                         counterfactual_results: np.ndarray):
         """
         Create ArviZ-style visualizations
 
@@ -294,12 +652,28 @@ class FaultDetector:
             observed_energy: Observed annual energy
             counterfactual_results: Results from counterfactual analysis
         """
-        if not ARVIZ_AVAILABLE:
-            print("⚠️  ArviZ not available, skipping visualization")
+        try:
+            import matplotlib
+            matplotlib.use('Agg')  # Non-interactive backend
+            import matplotlib.pyplot as plt
+        except ImportError:
+            print("⚠️  matplotlib not installed. Install with: uv pip install matplotlib")
+            print("   Skipping visualization")
             return
 
         print(f"\n📈 Creating Visualizations...")
 
+        results = dict(zip(RESULT_COLUMNS, counterfactual_results.T))
+        if self._summary is None:
+            self._summary = {
+                'infiltration_mult': self._summarize(posterior_samples),
+                'energy_savings_kwh': self._summarize(results['energy_savings_kwh']),
+                'cost_savings_usd': self._summarize(results['cost_savings_usd'])
+            }
+        infil = self._summary['infiltration_mult']
+        energy = self._summary['energy_savings_kwh']
+        cost = self._summary['cost_savings_usd']
+
         fig = plt.figure(figsize=(16, 12))
         gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
 
@@ -307,8 +681,8 @@ class FaultDetector:
         ax1 = fig.add_subplot(gs[0, :2])
         ax1.hist(posterior_samples, bins=30, color='steelblue', alpha=0.7, density=True)
         ax1.axvline(1.0, color='green', linestyle='--', linewidth=2, label='No leak (1.0)')
-        ax1.axvline(posterior_samples.mean(), color='red', linestyle='--', linewidth=2,
-                   label=f'Posterior mean ({posterior_samples.mean():.2f})')
+        ax1.axvline(infil['mean'], color='red', linestyle='--', linewidth=2,
+                   label=f'Posterior mean ({infil["mean"]:.2f})')
         ax1.set_xlabel('Infiltration Multiplier', fontsize=12)
         ax1.set_ylabel('Probability Density', fontsize=12)
         ax1.set_title('Posterior Distribution: Infiltration Multiplier', fontsize=14, fontweight='bold')
@@ -317,11 +691,14 @@ class FaultDetector:
 
         # 2. GP surrogate model with uncertainty
         ax2 = fig.add_subplot(gs[0, 2])
-        x_plot = np.linspace(0.5, 2.0, 100).reshape(-1, 1)
-        y_pred, y_std = self.gp.predict(x_plot, return_std=True)
+        if self._gp_curve is None:
+            x_plot = np.linspace(0.5, 2.0, 100)
+            (y_pred, y_std), = self._predict_batched(x_plot)
+        else:
+            x_plot, y_pred, y_std = self._gp_curve
 
         ax2.plot(x_plot, y_pred, 'b-', label='GP mean', linewidth=2)
-        ax2.fill_between(x_plot.ravel(), y_pred - 2*y_std, y_pred + 2*y_std,
+        ax2.fill_between(x_plot, y_pred - 2*y_std, y_pred + 2*y_std,
                         alpha=0.3, color='blue', label='95% CI')
         ax2.scatter(self.X_train, self.y_train, c='red', s=50, zorder=10, label='Training data')
         ax2.axhline(observed_energy, color='green', linestyle='--', linewidth=2, label='Observed')
@@ -333,11 +710,11 @@ class FaultDetector:
 
         # 3. Energy savings distribution
         ax3 = fig.add_subplot(gs[1, :2])
-        ax3.hist(counterfactual_results['energy_savings_kwh'], bins=30, color='orange', alpha=0.7, density=True)
+        ax3.hist(results['energy_savings_kwh'], bins=30, color='orange', alpha=0.7, density=True)
         ax3.axvline(0, color='red', linestyle='--', linewidth=2, label='No savings')
-        ax3.axvline(counterfactual_results['energy_savings_kwh'].mean(),
+        ax3.axvline(energy['mean'],
                    color='green', linestyle='--', linewidth=2,
-                   label=f'Mean: {counterfactual_results["energy_savings_kwh"].mean():,.0f} kWh/yr')
+                   label=f'Mean: {energy["mean"]:,.0f} kWh/yr')
         ax3.set_xlabel('Energy Savings (kWh/year)', fontsize=12)
         ax3.set_ylabel('Probability Density', fontsize=12)
         ax3.set_title('Counterfactual: Energy Savings if Leak Fixed', fontsize=14, fontweight='bold')
@@ -346,7 +723,7 @@ class FaultDetector:
 
         # 4. Cost savings distribution
         ax4 = fig.add_subplot(gs[1, 2])
-        ax4.hist(counterfactual_results['cost_savings_usd'], bins=30, color='green', alpha=0.7, density=True)
+        ax4.hist(results['cost_savings_usd'], bins=30, color='green', alpha=0.7, density=True)
         ax4.set_xlabel('Cost Savings ($/year)', fontsize=10)
         ax4.set_ylabel('Probability Density', fontsize=10)
         ax4.set_title('Annual Cost Savings', fontsize=12, fontweight='bold')
@@ -354,8 +731,8 @@ class FaultDetector:
 
         # 5. Scatter: Infiltration vs Energy
         ax5 = fig.add_subplot(gs[2, 0])
-        ax5.scatter(counterfactual_results['infiltration_mult'],
-                   counterfactual_results['faulty_energy_kwh'],
+        ax5.scatter(results['infiltration_mult'],
+                   results['faulty_energy_kwh'],
                    alpha=0.5, s=10, color='red', label='Faulty')
         ax5.axhline(observed_energy, color='blue', linestyle='--', linewidth=2, label='Observed')
         ax5.set_xlabel('Infiltration Mult', fontsize=10)
@@ -366,8 +743,8 @@ class FaultDetector:
 
         # 6. Scatter: Infiltration vs Savings
         ax6 = fig.add_subplot(gs[2, 1])
-        ax6.scatter(counterfactual_results['infiltration_mult'],
-                   counterfactual_results['energy_savings_kwh'],
+        ax6.scatter(results['infiltration_mult'],
+                   results['energy_savings_kwh'],
                    alpha=0.5, s=10, color='orange')
         ax6.axhline(0, color='red', linestyle='--', linewidth=1)
         ax6.set_xlabel('Infiltration Mult', fontsize=10)
@@ -383,18 +760,18 @@ class FaultDetector:
 FAULT DETECTION SUMMARY
 
 Infiltration Multiplier:
-  Mean:   {posterior_samples.mean():.3f}
-  Median: {np.median(posterior_samples):.3f}
-  95% CI: [{np.percentile(posterior_samples, 2.5):.3f},
-           {np.percentile(posterior_samples, 97.5):.3f}]
+  Mean:   {infil['mean']:.3f}
+  Median: {infil['median']:.3f}
+  95% CI: [{infil['p025']:.3f},
+           {infil['p975']:.3f}]
 
 Energy Savings Potential:
-  Mean:   {counterfactual_results['energy_savings_kwh'].mean():,.0f} kWh/yr
-  Median: {counterfactual_results['energy_savings_kwh'].median():,.0f} kWh/yr
+  Mean:   {energy['mean']:,.0f} kWh/yr
+  Median: {energy['median']:,.0f} kWh/yr
 
 Cost Savings Potential:
-  Mean:   ${counterfactual_results['cost_savings_usd'].mean():,.0f}/yr
-  Median: ${counterfactual_results['cost_savings_usd'].median():,.0f}/yr
+  Mean:   ${cost['mean']:,.0f}/yr
+  Median: ${cost['median']:,.0f}/yr
 
 Leak Probability:
   P(infiltration > 1.1) = {(posterior_samples > 1.1).sum() / len(posterior_samples) * 100:.1f}%
@@ -408,10 +785,10 @@ Leak Probability:
 
         # Save figure
         output_file = 'fault_detection_analysis.png'
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        fig.savefig(output_file, dpi=150, bbox_inches='tight')
         print(f"   ✅ Saved visualization: {output_file}")
 
-        plt.close()
+        plt.close(fig)
 
 
 def main():
@@ -451,7 +828,7 @@ def main():
     )
 
     # Step 3: Counterfactual analysis
-    counterfactual_results = detector.counterfactual_analysis(
+    counterfactual_results, summary = detector.counterfactual_analysis(
         posterior_samples=posterior_samples,
         electricity_rate=electricity_rate
     )
@@ -465,7 +842,8 @@ def main():
 
     # Save detailed results
     output_csv = 'fault_detection_results.csv'
-    counterfactual_results.to_csv(output_csv, index=False)
+    np.savetxt(output_csv, counterfactual_results, fmt='%.6g', delimiter=',',
+               header=','.join(RESULT_COLUMNS), comments='')
     print(f"\n💾 Saved detailed results: {output_csv}")
 
     print("\n" + "=" * 80)
@@ -473,8 +851,8 @@ def main():
     print("=" * 80)
 
     # Final recommendation
-    mean_savings = counterfactual_results['cost_savings_usd'].mean()
-    leak_severity = posterior_samples.mean()
+    mean_savings = summary['cost_savings_usd']['mean']
+    leak_severity = summary['infiltration_mult']['mean']
 
     print(f"\n💡 RECOMMENDATION:")
     if leak_severity > 1.2:
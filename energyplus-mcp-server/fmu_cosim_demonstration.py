@@ -5,12 +5,114 @@ Simulates what FMU co-simulation does using a simplified building thermal model
 Shows the concept without requiring actual FMU export
 """
 
+import math
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+NUMBA_AVAILABLE = False
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    pass
+
+
+def _step_loop(outdoor, heat_sp, cool_sp, ua, mass, gains, max_h, max_c, dt, T0):
+    """
+    Step the single-zone model through a whole setpoint schedule
+
+    Same physics as SimplifiedBuildingModel.do_step, applied per timestep.
+
+    Returns:
+        (zone_temp, heating_power, cooling_power) arrays, one value per step
+    """
+    n = len(outdoor)
+    zone_temp = np.empty(n)
+    heating_power = np.empty(n)
+    cooling_power = np.empty(n)
+
+    alpha = math.exp(-ua * dt / mass)
+    T = T0
+    for i, (t_out, hs, cs) in enumerate(zip(outdoor.tolist(), heat_sp.tolist(), cool_sp.tolist())):
+        # Proportional control outside the deadband, without branches: each
+        # power is clamped to [0, max] and masked by its trigger (heating and
+        # cooling cannot both trigger while the deadband is at least 1 K)
+        ph = max(0.0, min(max_h, (hs - T) * 500.0)) * (T < hs - 0.5)
+        pc = max(0.0, min(max_c, (T - cs) * 500.0)) * (T > cs + 0.5)
+
+        # Exact step towards the steady-state temperature of the step's inputs
+        t_inf = t_out + (gains + ph - pc) / ua
+        T = t_inf + (T - t_inf) * alpha
+        zone_temp[i] = T
+        heating_power[i] = ph
+        cooling_power[i] = pc
+    return zone_temp, heating_power, cooling_power
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _step_loop(outdoor, heat_sp, cool_sp, ua, mass, gains, max_h, max_c, dt, T0):
+        """Compiled twin of the Python version (indexed scalar loop)."""
+        n = outdoor.shape[0]
+        zone_temp = np.empty(n)
+        heating_power = np.empty(n)
+        cooling_power = np.empty(n)
+
+        alpha = math.exp(-ua * dt / mass)
+        T = T0
+        for i in range(n):
+            hs = heat_sp[i]
+            cs = cool_sp[i]
+            ph = max(0.0, min(max_h, (hs - T) * 500.0)) * (T < hs - 0.5)
+            pc = max(0.0, min(max_c, (T - cs) * 500.0)) * (T > cs + 0.5)
+
+            t_inf = outdoor[i] + (gains + ph - pc) / ua
+            T = t_inf + (T - t_inf) * alpha
+            zone_temp[i] = T
+            heating_power[i] = ph
+            cooling_power[i] = pc
+        return zone_temp, heating_power, cooling_power
+
+
+
+def _run_scenarios(outdoor, heat_sp, cool_sp, ua, mass, gains, max_h, max_c, dt, T0):
+    """
+    Step independent scenarios (one per row of the setpoint matrices) from
+    T0, all under the same outdoor temperature trace
+
+    Returns:
+        (zone_temp, heating_power, cooling_power) matrices, shape (n_scenarios, n_steps)
+    """
+    runs = [_step_loop(outdoor, h, c, ua, mass, gains, max_h, max_c, dt, T0)
+            for h, c in zip(heat_sp, cool_sp)]
+    return tuple(np.array(x) for x in zip(*runs))
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _run_scenarios(outdoor, heat_sp, cool_sp, ua, mass, gains, max_h, max_c, dt, T0):
+        """Multi-threaded twin (scenarios split across cores, no shared state)."""
+        n_scenarios, n = heat_sp.shape
+        zone_temp = np.empty((n_scenarios, n))
+        heating_power = np.empty((n_scenarios, n))
+        cooling_power = np.empty((n_scenarios, n))
+        for s in prange(n_scenarios):
+            t, h, c = _step_loop(outdoor, heat_sp[s], cool_sp[s],
+                                 ua, mass, gains, max_h, max_c, dt, T0)
+            zone_temp[s] = t
+            heating_power[s] = h
+            cooling_power[s] = c
+        return zone_temp, heating_power, cooling_power
+
+    # Compile (or load from the on-disk cache) at import, not on the first run
+    _step_loop(np.zeros(2), np.zeros(2), np.ones(2), 1.0, 1.0, 0.0, 1.0, 1.0, 1.0, 0.0)
+    _run_scenarios(np.zeros(2), np.zeros((2, 2)), np.ones((2, 2)),
+                   1.0, 1.0, 0.0, 1.0, 1.0, 1.0, 0.0)
+
+
 class SimplifiedBuildingModel:
     """
     Simplified thermal model that mimics what an FMU would do
@@ -25,7 +127,7 @@ class SimplifiedBuildingModel:
         self.time = 0
 
         # Building thermal properties
-        self.thermal_mass = 5000000  # J/K (thermal capacity) - much larger for stability
+        self.thermal_mass = 5000000  # J/K (thermal capacity) - much larger for stability of hourly P-control
         self.ua_value = 200  # W/K (heat loss coefficient)
         self.max_heating = 10000  # W
         self.max_cooling = 8000  # W
@@ -60,9 +162,6 @@ class SimplifiedBuildingModel:
         Simulate one timestep (like FMU doStep)
         """
 
-        # Calculate heat transfer with outdoors
-        q_transmission = self.ua_value * (self.outdoor_temp - self.zone_temp)
-
         # Determine HVAC power needed (with proportional control for stability)
         if self.zone_temp < self.heating_setpoint - 0.5:
             # Need heating
@@ -79,18 +178,65 @@ class SimplifiedBuildingModel:
             self.heating_power = 0
             self.cooling_power = 0
 
-        # Energy balance
-        q_net = (q_transmission +
-                self.internal_gains +
-                self.heating_power -
-                self.cooling_power)
+        # Heat gains, held constant over the step
+        q_gains = self.internal_gains + self.heating_power - self.cooling_power
 
-        # Update zone temperature
-        delta_temp = (q_net * timestep_seconds) / self.thermal_mass
-        self.zone_temp += delta_temp
+        # Update zone temperature: exact solution of
+        # C dT/dt = UA (T_out - T) + Q for constant inputs, which relaxes
+        # towards T_inf = T_out + Q/UA with time constant C/UA. Stable for
+        # any timestep, unlike an explicit Euler update
+        t_inf = self.outdoor_temp + q_gains / self.ua_value
+        alpha = math.exp(-self.ua_value * timestep_seconds / self.thermal_mass)
+        self.zone_temp = t_inf + (self.zone_temp - t_inf) * alpha
 
         self.time += timestep_seconds
 
+    def simulate(self, outdoor_temps, heating_setpoints, cooling_setpoints, timestep_seconds):
+        """
+        Run do_step over whole input schedules in one call
+
+        Returns:
+            (zone_temp, heating_power, cooling_power) arrays, one value per step
+        """
+        zone_temp, heating_power, cooling_power = _step_loop(
+            np.asarray(outdoor_temps, dtype=np.float64),
+            np.asarray(heating_setpoints, dtype=np.float64),
+            np.asarray(cooling_setpoints, dtype=np.float64),
+            float(self.ua_value), float(self.thermal_mass), float(self.internal_gains),
+            float(self.max_heating), float(self.max_cooling), float(timestep_seconds),
+            float(self.zone_temp)
+        )
+
+        # Leave the model in its end-of-run state, as after the last do_step
+        self.outdoor_temp = outdoor_temps[-1]
+        self.heating_setpoint = heating_setpoints[-1]
+        self.cooling_setpoint = cooling_setpoints[-1]
+        self.zone_temp = zone_temp[-1]
+        self.heating_power = heating_power[-1]
+        self.cooling_power = cooling_power[-1]
+        self.time += timestep_seconds * len(zone_temp)
+
+        return zone_temp, heating_power, cooling_power
+
+    def simulate_scenarios(self, outdoor_temps, heating_setpoints, cooling_setpoints,
+                           timestep_seconds):
+        """
+        Run independent copies of the model from its current state, one per
+        row of the setpoint matrices, under one shared outdoor temperature
+        trace; the model itself is left unchanged
+
+        Returns:
+            (zone_temp, heating_power, cooling_power) matrices, shape (n_scenarios, n_steps)
+        """
+        return _run_scenarios(
+            np.asarray(outdoor_temps, dtype=np.float64),
+            np.asarray(heating_setpoints, dtype=np.float64),
+            np.asarray(cooling_setpoints, dtype=np.float64),
+            float(self.ua_value), float(self.thermal_mass), float(self.internal_gains),
+            float(self.max_heating), float(self.max_cooling), float(timestep_seconds),
+            float(self.zone_temp)
+        )
+
 class BaselineController:
     """Traditional fixed schedule control"""
 
@@ -105,6 +251,11 @@ class BaselineController:
         else:
             return 18, 27  # Setback
 
+    def get_setpoints(self, hour_of_day, day_of_week, outdoor_temp):
+        """get_setpoint over whole arrays of hours (outdoor_temp is unused)"""
+        occupied = (day_of_week < 5) & (7 <= hour_of_day) & (hour_of_day < 18)
+        return np.where(occupied, 21.0, 18.0), np.where(occupied, 24.0, 27.0)
+
 class SmartController:
     """Smart adaptive control"""
 
@@ -130,8 +281,17 @@ class SmartController:
             else:
                 return 15, 30  # Deep setback
 
-def generate_weather(hours=168):
-    """Generate typical winter week weather"""
+    def get_setpoints(self, hour_of_day, day_of_week, outdoor_temp):
+        """get_setpoint over whole arrays of hours"""
+        occupied = (day_of_week < 5) & (7 <= hour_of_day) & (hour_of_day < 18)
+        heating = np.where(occupied,
+                           np.where(outdoor_temp < -5, 22.0, 21.0),
+                           np.where(outdoor_temp < 0, 16.0, 15.0))
+        cooling = np.where(occupied, np.where(outdoor_temp > 25, 25.0, 24.0), 30.0)
+        return heating, cooling
+
+def generate_weather(hours=168, rng=None):
+    """Generate typical winter week weather (noise from rng, if given)"""
     time = np.arange(hours)
 
     # Daily cycle: cold at night, warmer during day
@@ -141,83 +301,50 @@ def generate_weather(hours=168):
     weekly_trend = -0.05 * time
 
     # Some random variation
-    noise = np.random.normal(0, 2, hours)
+    noise = (np.random if rng is None else rng).normal(0, 2, hours)
 
     outdoor_temp = daily + weekly_trend + noise
 
     return outdoor_temp
 
-def run_cosimulation(controller, hours=168):
+def setpoint_schedule(controller, weather):
     """
-    Run co-simulation for one week
-    This mimics the FMU co-simulation loop
+    Control setpoints for every hour at once: the controllers only depend
+    on the clock and the weather, not on the building state
+    """
+    time = np.arange(len(weather))
+    return controller.get_setpoints(time % 24, (time // 24) % 7, weather)
+
+def report_run(controller, weather, heat_sp, cool_sp, zone_temps, heating_powers, cooling_powers):
+    """
+    Print progress and energy totals of one co-simulation run
+
+    Returns:
+        (results, total_energy) with results holding one array per output
     """
 
     print(f"\n{'='*70}")
     print(f"Running Co-Simulation: {controller.name}")
     print(f"{'='*70}\n")
 
-    # Initialize building FMU
-    building = SimplifiedBuildingModel(initial_temp=20)
+    # Progress
+    for hour in range(0, len(zone_temps), 24):
+        day = hour // 24 + 1
+        print(f"  Day {day} completed - Zone temp: {zone_temps[hour]:.1f}°C")
 
-    # Generate weather
-    weather = generate_weather(hours)
-
-    # Storage for results
     results = {
-        'time': [],
-        'zone_temp': [],
-        'outdoor_temp': [],
-        'heating_setpoint': [],
-        'cooling_setpoint': [],
-        'heating_power': [],
-        'cooling_power': []
+        'time': np.arange(len(zone_temps)),
+        'zone_temp': zone_temps,
+        'outdoor_temp': weather,
+        'heating_setpoint': heat_sp,
+        'cooling_setpoint': cool_sp,
+        'heating_power': heating_powers / 1000,  # kW
+        'cooling_power': cooling_powers / 1000  # kW
     }
 
-    # Co-simulation loop (like FMU master algorithm)
-    for hour in range(hours):
-        # Current conditions
-        outdoor_temp = weather[hour]
-        day_of_week = (hour // 24) % 7
-        hour_of_day = hour % 24
-
-        # Set outdoor temperature (from weather file)
-        building.set_outdoor_temp(outdoor_temp)
-
-        # Get control setpoints (from controller)
-        if isinstance(controller, SmartController):
-            heat_sp, cool_sp = controller.get_setpoint(hour_of_day, day_of_week, outdoor_temp)
-        else:
-            heat_sp, cool_sp = controller.get_setpoint(hour_of_day, day_of_week)
-
-        building.set_heating_setpoint(heat_sp)
-        building.set_cooling_setpoint(cool_sp)
-
-        # Simulate one hour (FMU.doStep)
-        building.do_step(3600)
-
-        # Read outputs (FMU.getReal)
-        zone_temp = building.get_zone_temp()
-        heating_power = building.get_heating_power()
-        cooling_power = building.get_cooling_power()
-
-        # Store results
-        results['time'].append(hour)
-        results['zone_temp'].append(zone_temp)
-        results['outdoor_temp'].append(outdoor_temp)
-        results['heating_setpoint'].append(heat_sp)
-        results['cooling_setpoint'].append(cool_sp)
-        results['heating_power'].append(heating_power / 1000)  # kW
-        results['cooling_power'].append(cooling_power / 1000)  # kW
-
-        # Progress
-        if hour % 24 == 0:
-            day = hour // 24 + 1
-            print(f"  Day {day} completed - Zone temp: {zone_temp:.1f}°C")
-
     # Calculate energy use
-    total_heating = sum(results['heating_power'])  # kWh (power * 1 hour)
-    total_cooling = sum(results['cooling_power'])
+    total_heating = results['heating_power'].sum()  # kWh (power * 1 hour)
+    total_cooling = results['cooling_power'].sum()
     total_energy = total_heating + total_cooling
 
     print(f"\n✅ Simulation completed!")
@@ -227,19 +354,57 @@ def run_cosimulation(controller, hours=168):
 
     return results, total_energy
 
-def compare_strategies():
-    """Compare baseline vs smart control"""
+def run_cosimulation(controller, weather=None, hours=168):
+    """
+    Run co-simulation for one week
+    This mimics the FMU co-simulation loop
+
+    Args:
+        controller: Control strategy
+        weather: Hourly outdoor temperatures (generated for `hours` if None)
+        hours: Simulation length when weather is generated
+    """
+
+    # Initialize building FMU
+    building = SimplifiedBuildingModel(initial_temp=20)
+
+    # Generate weather
+    if weather is None:
+        weather = generate_weather(hours)
+    heat_sp, cool_sp = setpoint_schedule(controller, weather)
+
+    # Co-simulation loop (like FMU master algorithm), run as one call
+    outputs = building.simulate(weather, heat_sp, cool_sp, 3600)
+
+    return report_run(controller, weather, heat_sp, cool_sp, *outputs)
+
+def compare_strategies(hours=168, seed=None):
+    """Compare baseline vs smart control on the same weather (seed makes it reproducible)"""
 
     print("\n" + "="*80)
     print("FMU CO-SIMULATION DEMONSTRATION")
     print("Comparing Control Strategies for Building Energy Management")
     print("="*80)
 
-    # Run baseline
-    baseline_results, baseline_energy = run_cosimulation(BaselineController())
+    # Each strategy is an independent trajectory of the same building, so
+    # both are stepped together in one multi-threaded call
+    controllers = [BaselineController(), SmartController()]
+    building = SimplifiedBuildingModel(initial_temp=20)
+
+    # One weather trace for both, so the savings come from the control only
+    weather = generate_weather(hours, np.random.default_rng(seed))
+    schedules = [setpoint_schedule(c, weather) for c in controllers]
+    heat_sp = np.array([hs for hs, _ in schedules])
+    cool_sp = np.array([cs for _, cs in schedules])
+
+    zone_temps, heating_powers, cooling_powers = building.simulate_scenarios(
+        weather, heat_sp, cool_sp, 3600)
 
-    # Run smart
-    smart_results, smart_energy = run_cosimulation(SmartController())
+    (baseline_results, baseline_energy), (smart_results, smart_energy) = [
+        report_run(c, weather, heat_sp[i], cool_sp[i],
+                   zone_temps[i], heating_powers[i], cooling_powers[i])
+        for i, c in enumerate(controllers)
+    ]
 
     # Calculate savings
     savings_kwh = baseline_energy - smart_energy